@@ -4,11 +4,22 @@ Aegis Security Dashboard Web Server
 Flask application that serves the security dashboard and provides API endpoints.
 """
 
+# Patch the stdlib before boto3/urllib3, flask or threading are imported so
+# their sockets and sleeps cooperate with gevent workers
+from gevent import monkey
+monkey.patch_all()
+
 import os
+import itertools
 import json
-import threading
+import logging
+import queue
 import time
-from flask import Flask, jsonify, send_from_directory, send_file, request
+import gevent
+import orjson
+from flask import Flask, Response, jsonify, send_from_directory, send_file, request
+from flask.json.provider import JSONProvider
+from flask_caching import Cache
 from flask_cors import CORS
 from datetime import datetime
 
@@ -17,15 +28,53 @@ from security_monitor import SecurityMonitor
 from event_generator import CloudEventGenerator
 from response_handler import ResponseHandler
 
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger('Aegis.App')
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by every jsonify call"""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand the encoded bytes straight to the response, skipping the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype='application/json')
+
 app = Flask(__name__, static_folder='aegis-dashboard/dist', static_url_path='')
+app.json = OrjsonProvider(app)
 CORS(app)
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
 
 # Global variables for monitoring
 security_monitor = None
 event_generator = None
 response_handler = None
-monitoring_thread = None
+monitoring_greenlet = None
 monitoring_active = False
+event_subscribers = set()
+
+# Cached ISO timestamp for handlers that only need ~100 ms resolution
+_now_iso = datetime.now().isoformat()
+_now_iso_expires = 0.0
+
+def now_iso():
+    """Current time as an ISO string, recomputed at most every 100 ms"""
+    global _now_iso, _now_iso_expires
+    now = time.monotonic()
+    if now >= _now_iso_expires:
+        _now_iso = datetime.now().isoformat()
+        _now_iso_expires = now + 0.1
+    return _now_iso
 
 # Stats tracking
 stats = {
@@ -33,38 +82,123 @@ stats = {
     'threats_detected': 0,
     'responses_executed': 0,
     'system_health': 'Active',
-    'last_update': datetime.now().isoformat()
+    'last_update': now_iso()
 }
 
-def background_monitoring():
-    """Background thread for security monitoring"""
-    global stats, monitoring_active
+# Counters backing stats; next() on itertools.count is atomic
+_events_processed = itertools.count(1)
+_threats_detected = itertools.count(1)
+_responses_executed = itertools.count(1)
+
+# Serialized /api/metrics payload, rebuilt whenever stats change
+_metrics_json = orjson.dumps(stats)
+_metrics_etag = '0-0-' + stats['last_update']
+
+def refresh_metrics():
+    """Re-serialize the metrics payload after a stats update"""
+    global _metrics_json, _metrics_etag
+    _metrics_json = orjson.dumps(stats)
+    _metrics_etag = f"{stats['events_processed']}-{stats['responses_executed']}-{stats['last_update']}"
+
+# Mock recent events are deterministic apart from their timestamp
+_RECENT_EVENTS = [
+    {
+        'id': f'evt_{i}',
+        'type': 'user_login' if i % 3 == 0 else 'api_call' if i % 3 == 1 else 'file_access',
+        'severity': 'low' if i % 4 != 0 else 'high',
+        'source': f'user{i%3+1}@company.com',
+        'ip_address': f'192.168.1.{20+i%10}'
+    }
+    for i in range(10)
+]
+
+# Mock investigation context shared by every event details lookup
+_EVENT_DETAILS_CONTEXT = {
+    'network_trace': {
+        'source_location': 'External',
+        'protocol': 'HTTPS',
+        'payload_size': '2.3KB',
+        'duration': '245ms'
+    },
+    'user_context': {
+        'recent_activity': ['login', 'file_access', 'api_call'],
+        'risk_score': 8.5,
+        'location': 'Unknown'
+    },
+    'recommendations': [
+        'Monitor user activity closely',
+        'Verify user identity',
+        'Check for additional suspicious behavior'
+    ]
+}
+
+def process_next_event():
+    """Generate, analyze and respond to one event"""
+    # Runs on the hub rather than a native worker thread: the response and
+    # AWS dispatch paths use gevent-patched locks and queues, which can only
+    # be woken from the hub's own thread
+    event = event_generator.generate_event()
+    threat_detected = security_monitor.analyze_event(event)
     
-    while monitoring_active:
+    if threat_detected:
+        response_handler.handle_threat(threat_detected, event)
+    
+    return event, threat_detected
+
+def publish_event(event, threat_detected):
+    """Push a processed event to every /api/events/stream subscriber"""
+    if not event_subscribers:
+        return
+    
+    # Serialize once for all subscribers
+    message = b'data: ' + orjson.dumps({'event': event, 'threat': threat_detected}) + b'\n\n'
+    for subscriber in list(event_subscribers):
         try:
-            # Generate and analyze events
-            event = event_generator.generate_event()
-            stats['events_processed'] += 1
-            
-            threat_detected = security_monitor.analyze_event(event)
-            
-            if threat_detected:
-                stats['threats_detected'] += 1
-                response_handler.handle_threat(threat_detected, event)
-                stats['responses_executed'] += 1
-            
-            stats['last_update'] = datetime.now().isoformat()
-            
-            # Wait before next event
-            time.sleep(2)
-            
-        except Exception as e:
-            print(f"Monitoring error: {e}")
-            time.sleep(5)
+            subscriber.put_nowait(message)
+        except queue.Full:
+            # Slow client; drop the event rather than buffer without bound
+            pass
+
+def monitoring_tick():
+    """Process one event, then schedule the next tick while monitoring is active"""
+    global monitoring_greenlet
+    
+    if not monitoring_active:
+        return
+    
+    delay = 2
+    try:
+        event, threat_detected = process_next_event()
+        stats['events_processed'] = next(_events_processed)
+        
+        if threat_detected:
+            stats['threats_detected'] = next(_threats_detected)
+            stats['responses_executed'] = next(_responses_executed)
+        
+        stats['last_update'] = now_iso()
+        refresh_metrics()
+        publish_event(event, threat_detected)
+        
+    except Exception:
+        logger.exception("Monitoring error")
+        delay = 5
+    
+    if monitoring_active:
+        monitoring_greenlet = gevent.spawn_later(delay, monitoring_tick)
+
+def start_monitoring():
+    """Start the tick chain unless monitoring is uninitialized or already scheduled"""
+    global monitoring_greenlet
+    
+    if event_generator is None:
+        return
+    
+    if monitoring_greenlet is None or monitoring_greenlet.dead:
+        monitoring_greenlet = gevent.spawn(monitoring_tick)
 
 @app.route('/')
 def index():
-    """Serve the main dashboard"""
+    """Serve the main dashboard (nginx.conf serves it directly in production)"""
     try:
         return send_file('aegis-dashboard/dist/index.html')
     except:
@@ -81,19 +215,32 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'aegis-security-dashboard',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': now_iso(),
         'monitoring': monitoring_active
     }), 200
 
 @app.route('/api/metrics')
 def get_metrics():
     """API endpoint for real-time security metrics"""
-    return jsonify(stats)
+    # Values change every monitoring tick, so validate instead of caching
+    response = Response(_metrics_json, mimetype='application/json')
+    response.set_etag(_metrics_etag)
+    # last_update is naive local time; attach the local offset so werkzeug
+    # does not read it as UTC
+    response.last_modified = datetime.fromisoformat(stats['last_update']).astimezone()
+    # Revalidate every poll rather than serving a stored copy
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@cache.memoize(timeout=30)
+def get_aws_health_status():
+    """AWS integration health, shared across status polls"""
+    return security_monitor.get_aws_health_status() if security_monitor else {}
 
 @app.route('/api/status')
 def get_status():
     """API endpoint for system status"""
-    aws_status = security_monitor.get_aws_health_status() if security_monitor else {}
+    aws_status = get_aws_health_status()
     
     return jsonify({
         'system_health': stats['system_health'],
@@ -106,20 +253,33 @@ def get_status():
     })
 
 @app.route('/api/events')
+@cache.cached(timeout=2)
 def get_recent_events():
     """API endpoint for recent security events (mock data for demo)"""
-    recent_events = [
-        {
-            'id': f'evt_{i}',
-            'type': 'user_login' if i % 3 == 0 else 'api_call' if i % 3 == 1 else 'file_access',
-            'severity': 'low' if i % 4 != 0 else 'high',
-            'timestamp': datetime.now().isoformat(),
-            'source': f'user{i%3+1}@company.com',
-            'ip_address': f'192.168.1.{20+i%10}'
-        }
-        for i in range(10)
-    ]
-    return jsonify(recent_events)
+    timestamp = now_iso()
+    return jsonify([{**event, 'timestamp': timestamp} for event in _RECENT_EVENTS])
+
+@app.route('/api/events/stream')
+def stream_events():
+    """Server-Sent Events stream of events as the monitor processes them"""
+    subscriber = queue.Queue(maxsize=100)
+    event_subscribers.add(subscriber)
+    
+    def generate():
+        try:
+            while True:
+                try:
+                    yield subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield b': keep-alive\n\n'
+        finally:
+            event_subscribers.discard(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/api/monitoring/toggle', methods=['POST'])
 def toggle_monitoring():
@@ -127,6 +287,9 @@ def toggle_monitoring():
     global monitoring_active
     monitoring_active = not monitoring_active
     
+    if monitoring_active:
+        start_monitoring()
+    
     return jsonify({
         'status': 'success',
         'monitoring_active': monitoring_active,
@@ -148,14 +311,16 @@ def manual_threat_response():
         'isolate_network': 'Network segment isolated'
     }
     
-    stats['responses_executed'] += 1
+    stats['responses_executed'] = next(_responses_executed)
+    stats['last_update'] = now_iso()
+    refresh_metrics()
     
     return jsonify({
         'status': 'success',
         'threat_id': threat_id,
         'action_taken': action,
         'message': response_actions.get(action, 'Action executed'),
-        'timestamp': datetime.now().isoformat()
+        'timestamp': now_iso()
     })
 
 @app.route('/api/settings/alert-threshold', methods=['POST'])
@@ -176,33 +341,15 @@ def set_alert_threshold():
 @app.route('/api/investigation/details/<event_id>')
 def get_event_details(event_id):
     """Get detailed information about a specific event"""
-    # Mock detailed investigation data
-    details = {
+    return jsonify({
         'event_id': event_id,
         'full_log': f'Detailed logs for event {event_id}...',
-        'network_trace': {
-            'source_location': 'External',
-            'protocol': 'HTTPS',
-            'payload_size': '2.3KB',
-            'duration': '245ms'
-        },
-        'user_context': {
-            'recent_activity': ['login', 'file_access', 'api_call'],
-            'risk_score': 8.5,
-            'location': 'Unknown'
-        },
-        'recommendations': [
-            'Monitor user activity closely',
-            'Verify user identity',
-            'Check for additional suspicious behavior'
-        ]
-    }
-    
-    return jsonify(details)
+        **_EVENT_DETAILS_CONTEXT
+    })
 
 @app.route('/<path:path>')
 def serve_static_files(path):
-    """Serve static files from the React build"""
+    """Serve static files from the React build when running without nginx"""
     try:
         return send_from_directory('aegis-dashboard/dist', path)
     except:
@@ -214,7 +361,7 @@ def serve_static_files(path):
 
 def initialize_monitoring():
     """Initialize security monitoring components"""
-    global security_monitor, event_generator, response_handler, monitoring_thread, monitoring_active
+    global security_monitor, event_generator, response_handler, monitoring_active
     
     try:
         # Initialize components
@@ -224,17 +371,15 @@ def initialize_monitoring():
         
         # Start background monitoring (initially stopped for user control)
         monitoring_active = False
-        monitoring_thread = threading.Thread(target=background_monitoring, daemon=True)
-        monitoring_thread.start()
         
-        print("🛡️  Security monitoring initialized successfully")
+        logger.info("🛡️  Security monitoring initialized successfully")
         
     except Exception as e:
-        print(f"⚠️  Warning: Could not initialize security monitoring: {e}")
-        print("🌐 Web server will run in dashboard-only mode")
+        logger.warning("⚠️  Could not initialize security monitoring: %s", e)
+        logger.warning("🌐 Web server will run in dashboard-only mode")
 
 if __name__ == '__main__':
-    print("🌐 Starting Aegis Security Dashboard Web Server...")
+    logger.info("🌐 Starting Aegis Security Dashboard Web Server...")
     
     # Initialize monitoring (optional, web server works without it)
     initialize_monitoring()
@@ -242,8 +387,8 @@ if __name__ == '__main__':
     # Get port from environment or default to 5000
     port = int(os.environ.get('PORT', 5000))
     
-    print(f"🚀 Server starting on port {port}")
-    print(f"📊 Dashboard: http://localhost:{port}")
-    print(f"❤️  Health check: http://localhost:{port}/health")
+    logger.info("🚀 Server starting on port %d", port)
+    logger.info("📊 Dashboard: http://localhost:%d", port)
+    logger.info("❤️  Health check: http://localhost:%d/health", port)
     
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
@@ -5,13 +5,22 @@ This module provides integration with AWS services for enhanced cloud monitoring
 and automated response capabilities.
 """
 
+import atexit
 import boto3
-import json
+import collections
+import concurrent.futures
 import logging
+import threading
 import time
+import orjson
+from botocore.config import Config
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+# Log payloads are event and threat dicts of native types; any naive datetime
+# is UTC (utcnow) and other unsupported values fall back to str
+LOG_JSON_OPTIONS = orjson.OPT_NAIVE_UTC
+
 class AWSIntegration:
     """Handles AWS CloudWatch metrics and Lambda function invocations"""
     
@@ -19,14 +28,45 @@ class AWSIntegration:
         """Initialize AWS clients"""
         self.logger = logging.getLogger('Aegis.AWS')
         
+        # Metric and log batching (CloudWatch API per-call limits)
+        self.flush_interval = 10
+        self.max_metric_batch = 1000
+        self.max_log_batch = 10000
+        self.max_log_batch_bytes = 1048576
+        self._metric_buffer = collections.deque()
+        self._log_buffer = collections.defaultdict(list)
+        self._buffer_lock = threading.Lock()
+        self._flush_stop = threading.Event()
+        self._flush_thread = None
+        
+        # Background executor so callers never wait on AWS round trips
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix='aws-io'
+        )
+        self._region = 'unknown'
+        
         try:
-            # Initialize AWS clients
-            self.cloudwatch = boto3.client('cloudwatch')
-            self.lambda_client = boto3.client('lambda')
-            self.logs_client = boto3.client('logs')
+            # Initialize AWS clients from one session so credentials and
+            # config files are resolved once
+            self._session = boto3.Session()
+            self._region = self._session.region_name
+            # One pooled, keep-alive connection set per client, sized for a
+            # gevent worker with many concurrent requests; explicit timeouts
+            # bound a slow or unreachable endpoint well below botocore's 60 s
+            client_config = Config(
+                connect_timeout=5,
+                read_timeout=10,
+                max_pool_connections=100,
+                retries={'mode': 'adaptive', 'max_attempts': 3},
+                tcp_keepalive=True
+            )
+            self.cloudwatch = self._session.client('cloudwatch', config=client_config)
+            self.lambda_client = self._session.client('lambda', config=client_config)
+            self.logs_client = self._session.client('logs', config=client_config)
             
             # Test AWS connectivity
             self._test_aws_connection()
+            self._start_flush_thread()
             self.logger.info("✅ AWS integration initialized successfully")
             
         except Exception as e:
@@ -44,8 +84,100 @@ class AWSIntegration:
         except Exception as e:
             self.logger.warning(f"⚠️  CloudWatch test failed: {e}")
     
+    def _start_flush_thread(self):
+        """Start the background thread that periodically flushes buffered data"""
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop, name='aegis-aws-flush', daemon=True
+        )
+        self._flush_thread.start()
+        atexit.register(self.flush)
+    
+    def _submit(self, fn, *args):
+        """Run fn on the background executor, or inline once it has shut down"""
+        try:
+            self._executor.submit(fn, *args)
+        except RuntimeError:
+            # The executor is shut down before atexit handlers run, so work
+            # queued during interpreter exit is delivered on the caller's thread
+            fn(*args)
+    
+    def _flush_loop(self):
+        """Flush buffered metrics and logs every flush_interval seconds"""
+        while not self._flush_stop.wait(self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Send all buffered metrics and log events to CloudWatch"""
+        self.flush_metrics()
+        self.flush_logs()
+    
+    def flush_metrics(self) -> bool:
+        """Send buffered security metrics in batches of up to max_metric_batch"""
+        if not self.cloudwatch:
+            return False
+        
+        with self._buffer_lock:
+            metrics = list(self._metric_buffer)
+            self._metric_buffer.clear()
+        
+        if not metrics:
+            return True
+        
+        try:
+            for start in range(0, len(metrics), self.max_metric_batch):
+                self.cloudwatch.put_metric_data(
+                    Namespace='Aegis/Security',
+                    MetricData=metrics[start:start + self.max_metric_batch]
+                )
+            
+            self.logger.info(f"📊 {len(metrics)} metrics flushed to CloudWatch")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ Failed to send CloudWatch metrics: {e}")
+            return False
+    
+    def flush_logs(self) -> bool:
+        """Send buffered log events, one put_log_events call per batch and stream"""
+        if not self.logs_client:
+            return False
+        
+        with self._buffer_lock:
+            pending = dict(self._log_buffer)
+            self._log_buffer.clear()
+        
+        success = True
+        for (log_group, stream_name), log_events in pending.items():
+            try:
+                for batch in self._log_batches(log_events):
+                    self.logs_client.put_log_events(
+                        logGroupName=log_group,
+                        logStreamName=stream_name,
+                        logEvents=batch
+                    )
+            except Exception as e:
+                self.logger.error(f"❌ Failed to send security log: {e}")
+                success = False
+        
+        return success
+    
+    def _log_batches(self, log_events):
+        """Split log events into batches within the PutLogEvents count and size limits"""
+        batch, batch_bytes = [], 0
+        for log_event in log_events:
+            # CloudWatch counts 26 bytes of overhead per log event
+            event_bytes = len(log_event['message'].encode('utf-8')) + 26
+            if batch and (len(batch) >= self.max_log_batch or
+                          batch_bytes + event_bytes > self.max_log_batch_bytes):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(log_event)
+            batch_bytes += event_bytes
+        if batch:
+            yield batch
+    
     def send_security_metric(self, event_data: Dict[str, Any]) -> bool:
-        """Send security event metrics to CloudWatch"""
+        """Queue security event metrics for the next CloudWatch batch"""
         if not self.cloudwatch:
             return False
         
@@ -80,55 +212,73 @@ class AWSIntegration:
                 }
             ]
             
-            # Send metrics to CloudWatch
-            response = self.cloudwatch.put_metric_data(
-                Namespace='Aegis/Security',
-                MetricData=metrics
-            )
+            # Buffer metrics; a full batch is flushed right away
+            with self._buffer_lock:
+                self._metric_buffer.extend(metrics)
+                batch_full = len(self._metric_buffer) >= self.max_metric_batch
+            
+            if batch_full:
+                self._submit(self.flush_metrics)
             
-            self.logger.info(f"📊 Metrics sent to CloudWatch for {event_type} event")
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to send CloudWatch metrics: {e}")
+            self.logger.error(f"❌ Failed to queue CloudWatch metrics: {e}")
             return False
     
     def send_threat_alert(self, threat_data: Dict[str, Any]) -> bool:
-        """Send high-priority threat alerts to CloudWatch"""
+        """Queue a high-priority threat alert for background delivery to CloudWatch"""
         if not self.cloudwatch:
             return False
         
+        # Only critical threats raise the alarm metric; skip all payload work otherwise
+        if threat_data.get('risk_score', 0) < 7:
+            return False
+        
+        self._submit(self._send_threat_alert_sync, threat_data)
+        return True
+    
+    def _send_threat_alert_sync(self, threat_data: Dict[str, Any]) -> bool:
+        """Send high-priority threat alerts to CloudWatch"""
         try:
             # Create alarm-triggering metric for critical threats
-            if threat_data.get('risk_score', 0) >= 7:
-                self.cloudwatch.put_metric_data(
-                    Namespace='Aegis/Alerts',
-                    MetricData=[
-                        {
-                            'MetricName': 'CriticalThreats',
-                            'Dimensions': [
-                                {'Name': 'ThreatType', 'Value': threat_data.get('threat_type', 'unknown')},
-                                {'Name': 'SourceIP', 'Value': threat_data.get('source_ip', 'unknown')}
-                            ],
-                            'Value': 1,
-                            'Unit': 'Count',
-                            'Timestamp': datetime.utcnow()
-                        }
-                    ]
-                )
-                
-                self.logger.info(f"🚨 Critical threat alert sent to CloudWatch: {threat_data.get('threat_type')}")
-                return True
-                
+            self.cloudwatch.put_metric_data(
+                Namespace='Aegis/Alerts',
+                MetricData=[
+                    {
+                        'MetricName': 'CriticalThreats',
+                        'Dimensions': [
+                            {'Name': 'ThreatType', 'Value': threat_data.get('threat_type', 'unknown')},
+                            {'Name': 'SourceIP', 'Value': threat_data.get('source_ip', 'unknown')}
+                        ],
+                        'Value': 1,
+                        'Unit': 'Count',
+                        'Timestamp': datetime.utcnow()
+                    }
+                ]
+            )
+            
+            self.logger.info(f"🚨 Critical threat alert sent to CloudWatch: {threat_data.get('threat_type')}")
+            return True
+            
         except Exception as e:
             self.logger.error(f"❌ Failed to send threat alert: {e}")
             return False
     
     def trigger_lambda_response(self, threat_data: Dict[str, Any]) -> bool:
-        """Trigger AWS Lambda function for automated threat response"""
+        """Queue an AWS Lambda invocation for automated threat response"""
         if not self.lambda_client:
             return False
         
+        # Only high-risk threats invoke the response function
+        if threat_data.get('risk_score', 0) < 8:
+            return False
+        
+        self._submit(self._trigger_lambda_response_sync, threat_data)
+        return True
+    
+    def _trigger_lambda_response_sync(self, threat_data: Dict[str, Any]) -> bool:
+        """Trigger AWS Lambda function for automated threat response"""
         # Lambda function name for threat response (would need to be created in AWS)
         function_name = 'aegis-threat-response'
         
@@ -144,16 +294,15 @@ class AWSIntegration:
                 'description': threat_data.get('description')
             }
             
-            # Invoke Lambda function asynchronously for high-risk threats
-            if threat_data.get('risk_score', 0) >= 8:
-                response = self.lambda_client.invoke(
-                    FunctionName=function_name,
-                    InvocationType='Event',  # Asynchronous invocation
-                    Payload=json.dumps(payload)
-                )
-                
-                self.logger.info(f"🚀 Lambda function triggered for threat: {threat_data.get('event_id')}")
-                return True
+            # Invoke Lambda function asynchronously
+            self.lambda_client.invoke(
+                FunctionName=function_name,
+                InvocationType='Event',  # Asynchronous invocation
+                Payload=orjson.dumps(payload)
+            )
+            
+            self.logger.info(f"🚀 Lambda function triggered for threat: {threat_data.get('event_id')}")
+            return True
             
         except self.lambda_client.exceptions.ResourceNotFoundException:
             self.logger.warning(f"⚠️  Lambda function '{function_name}' not found - would need to be created in AWS")
@@ -190,7 +339,7 @@ class AWSIntegration:
             return False
     
     def send_security_log(self, log_group: str, stream_name: str, log_data: Dict[str, Any]) -> bool:
-        """Send detailed security logs to CloudWatch Logs"""
+        """Queue detailed security logs for the next CloudWatch Logs batch"""
         if not self.logs_client:
             return False
         
@@ -198,20 +347,22 @@ class AWSIntegration:
             # Prepare log event
             log_event = {
                 'timestamp': int(time.time() * 1000),
-                'message': json.dumps(log_data, default=str)
+                'message': orjson.dumps(log_data, default=str, option=LOG_JSON_OPTIONS).decode()
             }
             
-            # Send log to CloudWatch
-            self.logs_client.put_log_events(
-                logGroupName=log_group,
-                logStreamName=stream_name,
-                logEvents=[log_event]
-            )
+            # Buffer log event per stream; a full batch is flushed right away
+            with self._buffer_lock:
+                stream_events = self._log_buffer[(log_group, stream_name)]
+                stream_events.append(log_event)
+                batch_full = len(stream_events) >= self.max_log_batch
+            
+            if batch_full:
+                self._submit(self.flush_logs)
             
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to send security log: {e}")
+            self.logger.error(f"❌ Failed to queue security log: {e}")
             return False
     
     def get_health_status(self) -> Dict[str, Any]:
@@ -220,5 +371,5 @@ class AWSIntegration:
             'cloudwatch_available': self.cloudwatch is not None,
             'lambda_available': self.lambda_client is not None,
             'logs_available': self.logs_client is not None,
-            'aws_region': boto3.Session().region_name if self.cloudwatch else 'unknown'
+            'aws_region': self._region if self.cloudwatch else 'unknown'
         }
\ No newline at end of file
@@ -4,9 +4,15 @@ Event Generator Module for Aegis Cloud Security System
 Generates mock security events simulating cloud environment activities.
 """
 
-import random
+import asyncio
+import os
 import json
+from collections import Counter
+from random import randrange, random as _rand
 from datetime import datetime, timedelta
+from types import MappingProxyType
+
+import numpy as np
 
 class CloudEventGenerator:
     """
@@ -102,26 +108,67 @@ class CloudEventGenerator:
             }
         ]
         
+        # Freeze the templates with every key present so events can be built by unpacking
+        self.normal_events = tuple(self._freeze_template(t) for t in self.normal_events)
+        self.threat_events = tuple(self._freeze_template(t) for t in self.threat_events)
+        
         # IP address pools for simulation
-        self.normal_ips = [
+        self.normal_ips = (
             "192.168.1.10", "192.168.1.15", "192.168.1.20", "192.168.1.25",
             "10.0.0.5", "10.0.0.10", "10.0.0.15", "172.16.0.5"
-        ]
+        )
         
-        self.suspicious_ips = [
+        self.suspicious_ips = (
             "203.0.113.45", "198.51.100.23", "203.0.113.78", "198.51.100.67",
             "185.220.101.182", "185.220.102.8", "94.142.241.111"
-        ]
+        )
         
         # User ID pools
-        self.normal_users = [
+        self.normal_users = (
             "user001", "user002", "user003", "admin001", "service_account_01",
             "developer_01", "analyst_01", "manager_01"
-        ]
+        )
         
-        self.suspicious_users = [
+        self.suspicious_users = (
             "temp_user", "guest_user", "unknown_user", "test_account", "backdoor_user"
-        ]
+        )
+        
+        # AWS regions for event metadata
+        self.regions = ("us-east-1", "us-west-2", "eu-central-1")
+        
+        # Pool sizes cached for indexed sampling in generate_event
+        self._n_normal_events = len(self.normal_events)
+        self._n_threat_events = len(self.threat_events)
+        self._n_normal_ips = len(self.normal_ips)
+        self._n_suspicious_ips = len(self.suspicious_ips)
+        self._n_normal_users = len(self.normal_users)
+        self._n_suspicious_users = len(self.suspicious_users)
+        self._n_regions = len(self.regions)
+        
+        # Object arrays of the pools for vectorized batch sampling
+        self._rng = np.random.default_rng()
+        self._normal_events_arr = self._object_array(self.normal_events)
+        self._threat_events_arr = self._object_array(self.threat_events)
+        self._normal_ips_arr = self._object_array(self.normal_ips)
+        self._suspicious_ips_arr = self._object_array(self.suspicious_ips)
+        self._normal_users_arr = self._object_array(self.normal_users)
+        self._suspicious_users_arr = self._object_array(self.suspicious_users)
+        self._regions_arr = self._object_array(self.regions)
+    
+    @staticmethod
+    def _freeze_template(template):
+        """Return a read-only copy of a template with source_ip and user_id always set."""
+        template = dict(template)
+        template.setdefault("source_ip", None)
+        template.setdefault("user_id", None)
+        return MappingProxyType(template)
+    
+    @staticmethod
+    def _object_array(items):
+        """Build a 1-D object array without NumPy unpacking nested values."""
+        arr = np.empty(len(items), dtype=object)
+        arr[:] = items
+        return arr
     
     def generate_event(self):
         """
@@ -131,54 +178,120 @@ class CloudEventGenerator:
             dict: A complete security event with all necessary fields
         """
         # Determine if this will be a normal event or a threat (20% chance of threat)
-        is_threat = random.random() < 0.2
+        is_threat = _rand() < 0.2
         
         if is_threat:
-            event_template = random.choice(self.threat_events).copy()
-            source_ip = random.choice(self.suspicious_ips)
-            user_id = random.choice(self.suspicious_users)
+            event_template = self.threat_events[randrange(self._n_threat_events)]
+            source_ip = self.suspicious_ips[randrange(self._n_suspicious_ips)]
+            user_id = self.suspicious_users[randrange(self._n_suspicious_users)]
         else:
-            event_template = random.choice(self.normal_events).copy()
-            source_ip = random.choice(self.normal_ips)
-            user_id = random.choice(self.normal_users)
+            event_template = self.normal_events[randrange(self._n_normal_events)]
+            source_ip = self.normal_ips[randrange(self._n_normal_ips)]
+            user_id = self.normal_users[randrange(self._n_normal_users)]
         
         # Generate timestamp (current time with slight random variation)
-        timestamp = datetime.now() - timedelta(seconds=random.randint(0, 300))
-        
-        # Build the complete event
-        event = {
-            "timestamp": timestamp.isoformat(),
-            "event_id": f"evt_{random.randint(100000, 999999)}",
-            "event_type": event_template["event_type"],
-            "severity": event_template["severity"],
-            "description": event_template["description"],
-            "source_ip": event_template.get("source_ip") or source_ip,
-            "user_id": event_template.get("user_id") or user_id,
-            "resource": event_template["resource"],
+        timestamp = datetime.now() - timedelta(seconds=randrange(301))
+        
+        return self._build_event(
+            event_template,
+            source_ip,
+            user_id,
+            timestamp.isoformat(),
+            "evt_" + os.urandom(3).hex(),
+            self.regions[randrange(self._n_regions)],
+            randrange(1, 4),
+            randrange(10),
+            "sess_" + os.urandom(2).hex()
+        )
+    
+    async def stream_events(self, interval=0):
+        """
+        Asynchronously yield mock security events indefinitely.
+        
+        Args:
+            interval (float): Seconds to wait between events; 0 only yields
+                control to the event loop
+            
+        Yields:
+            dict: A complete security event, as from generate_event()
+        """
+        while True:
+            yield self.generate_event()
+            await asyncio.sleep(interval)
+    
+    def _build_event(self, event_template, source_ip, user_id, timestamp,
+                     event_id, region, major_version, minor_version, session_id):
+        """Build a complete event from a template and the sampled fields."""
+        # Threat templates carry their threat_indicators through the unpack
+        return {
+            **event_template,
+            "timestamp": timestamp,
+            "event_id": event_id,
+            "source_ip": event_template["source_ip"] or source_ip,
+            "user_id": event_template["user_id"] or user_id,
             "metadata": {
-                "region": random.choice(["us-east-1", "us-west-2", "eu-central-1"]),
-                "service_version": f"v{random.randint(1, 3)}.{random.randint(0, 9)}",
-                "session_id": f"sess_{random.randint(1000, 9999)}"
+                "region": region,
+                "service_version": f"v{major_version}.{minor_version}",
+                "session_id": session_id
             }
         }
-        
-        # Add threat indicators if it's a threat event
-        if "threat_indicators" in event_template:
-            event["threat_indicators"] = event_template["threat_indicators"]
-        
-        return event
     
     def generate_event_batch(self, count=10):
         """
         Generate a batch of mock security events.
         
+        All random fields for the batch are drawn in a handful of NumPy
+        calls instead of several Python-level RNG calls per event.
+        
         Args:
             count (int): Number of events to generate
             
         Returns:
             list: List of security events
         """
-        return [self.generate_event() for _ in range(count)]
+        if count <= 0:
+            return []
+        
+        rng = self._rng
+        is_threat = rng.random(count) < 0.2
+        
+        def pick(threat_pool, normal_pool):
+            # Sample both pools for every slot, then keep the one matching the event kind
+            return np.where(
+                is_threat,
+                threat_pool[rng.integers(0, len(threat_pool), count)],
+                normal_pool[rng.integers(0, len(normal_pool), count)]
+            ).tolist()
+        
+        templates = pick(self._threat_events_arr, self._normal_events_arr)
+        source_ips = pick(self._suspicious_ips_arr, self._normal_ips_arr)
+        user_ids = pick(self._suspicious_users_arr, self._normal_users_arr)
+        
+        now = datetime.now()
+        timestamps = [
+            (now - timedelta(seconds=offset)).isoformat()
+            for offset in rng.integers(0, 301, count).tolist()
+        ]
+        
+        # One urandom read covers every ID: 3 bytes per event ID, 2 per session ID
+        tokens = os.urandom(count * 5).hex()
+        event_ids = ["evt_" + tokens[i:i + 6] for i in range(0, count * 10, 10)]
+        session_ids = ["sess_" + tokens[i + 6:i + 10] for i in range(0, count * 10, 10)]
+        
+        return [
+            self._build_event(*fields)
+            for fields in zip(
+                templates,
+                source_ips,
+                user_ids,
+                timestamps,
+                event_ids,
+                self._regions_arr[rng.integers(0, len(self.regions), count)].tolist(),
+                rng.integers(1, 4, count).tolist(),
+                rng.integers(0, 10, count).tolist(),
+                session_ids
+            )
+        ]
     
     def get_event_statistics(self, events):
         """
@@ -193,24 +306,9 @@ class CloudEventGenerator:
         if not events:
             return {"total": 0}
         
-        stats = {
+        return {
             "total": len(events),
-            "by_severity": {},
-            "by_type": {},
-            "threat_events": 0
+            "by_severity": dict(Counter(event.get("severity", "unknown") for event in events)),
+            "by_type": dict(Counter(event.get("event_type", "unknown") for event in events)),
+            "threat_events": sum(1 for event in events if "threat_indicators" in event)
         }
-        
-        for event in events:
-            # Count by severity
-            severity = event.get("severity", "unknown")
-            stats["by_severity"][severity] = stats["by_severity"].get(severity, 0) + 1
-            
-            # Count by type
-            event_type = event.get("event_type", "unknown")
-            stats["by_type"][event_type] = stats["by_type"].get(event_type, 0) + 1
-            
-            # Count threats
-            if "threat_indicators" in event:
-                stats["threat_events"] += 1
-        
-        return stats
@@ -6,11 +6,17 @@ bind = "0.0.0.0:5000"
 backlog = 2048
 
 # Worker processes
-workers = 1
-worker_class = "sync"
+# Monitoring state (stats, toggle) lives in each worker process, so the
+# dashboard stays consistent with one worker; scale out via WEB_CONCURRENCY
+# (typically 2 x CPUs + 1) when per-worker state is acceptable
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+# Greenlets yield on socket I/O, so a request blocked on boto3 does not
+# stall /health or /api/metrics (app.py monkey-patches before imports)
+worker_class = "gevent"
 worker_connections = 1000
 timeout = 30
-keepalive = 2
+# Outlive nginx's idle upstream connections so polls reuse them
+keepalive = 75
 
 # Logging
 loglevel = "info"
@@ -31,4 +37,17 @@ limit_request_fields = 100
 limit_request_field_size = 8190
 
 # Performance
-preload_app = True
\ No newline at end of file
+preload_app = True
+
+
+def post_worker_init(worker):
+    """Initialize monitoring in each worker after the fork.
+
+    boto3 clients and the monitoring/flush threads are not fork-safe, so
+    they are created per worker rather than in the preloaded master.
+    Setup runs in a greenlet so the AWS connectivity check cannot hold up
+    the worker's first heartbeat past the timeout.
+    """
+    import gevent
+    import app
+    gevent.spawn(app.initialize_monitoring)
\ No newline at end of file
@@ -11,6 +11,8 @@ Deployment Instructions:
 4. Copy this code to the Lambda function
 5. Configure appropriate IAM permissions for security actions
 6. Set up CloudWatch integration for logging
+7. Set AEGIS_SNS_TOPIC_ARN to enable emergency SNS notifications
+8. Attach a layer providing orjson built for the function's architecture
 
 Required IAM Permissions:
 - CloudWatch Logs access
@@ -19,15 +21,77 @@ Required IAM Permissions:
 - Systems Manager (for automated remediation)
 """
 
-import json
-import boto3
+import itertools
+import math
+import os
 import logging
-from datetime import datetime
+import re
+import orjson
+from collections import deque
+from datetime import datetime, timezone
+from functools import partial
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# SNS notifications are sent once an alert topic is configured, e.g.
+# arn:aws:sns:us-east-2:YOUR_ACCOUNT:aegis-emergency-alerts
+SNS_TOPIC_ARN = os.environ.get('AEGIS_SNS_TOPIC_ARN')
+
+# Security action audit records go to CloudWatch Logs once a log group is
+# configured; entries are buffered and sent by flush_logs()
+LOG_GROUP = os.environ.get('AEGIS_LOG_GROUP')
+LOG_STREAM = os.environ.get('AEGIS_LOG_STREAM', 'security-actions')
+_log_buffer = deque()
+LOG_BATCH_SIZE = 10
+
+# RFC1918 private ranges: 10/8, 172.16/12 and 192.168/16
+_PRIVATE_RE = re.compile(r'^(10\.|192\.168\.|172\.(1[6-9]|2\d|3[01])\.)')
+
+class LazyJson:
+    """Log argument that is JSON-encoded only if the record is actually emitted"""
+    __slots__ = ('obj',)
+    
+    def __init__(self, obj):
+        self.obj = obj
+    
+    def __str__(self):
+        return orjson.dumps(self.obj, default=str).decode()
+
+# Incident sequence numbers, unique within an execution environment
+_incident_ids = itertools.count(1)
+
+# AWS clients by service name, reused across warm invocations, all created
+# from one botocore session so credentials and config are resolved once
+_CLIENTS = {}
+_SESSION = None
+
+def get_client(service):
+    """
+    Return a cached botocore client, creating it on first use.
+    
+    botocore is imported here rather than at module load so invocations
+    that never reach AWS (e.g. medium threats) skip loading it entirely.
+    """
+    global _SESSION
+    client = _CLIENTS.get(service)
+    if client is None:
+        if _SESSION is None:
+            import botocore.session
+            _SESSION = botocore.session.get_session()
+        client = _CLIENTS[service] = _SESSION.create_client(service)
+    return client
+
+# Fields every threat event must carry (see AWSIntegration._trigger_lambda_response_sync)
+REQUIRED_FIELDS = ('event_id', 'risk_score')
+
+def _is_score(value):
+    """True for a finite numeric risk score (bools, NaN and infinities excluded)"""
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return isinstance(value, int) and not isinstance(value, bool)
+
 def lambda_handler(event, context):
     """
     Main Lambda handler for processing security threats from Aegis
@@ -40,7 +104,26 @@ def lambda_handler(event, context):
         dict: Response with action results
     """
     
-    logger.info(f"🚨 Aegis threat response triggered: {json.dumps(event)}")
+    logger.info("🚨 Aegis threat response triggered: %s", LazyJson(event))
+    
+    # Reject malformed events before any response work or AWS client setup
+    if not isinstance(event, dict):
+        missing = list(REQUIRED_FIELDS)
+    else:
+        missing = [field for field in REQUIRED_FIELDS if field not in event]
+    if missing or not _is_score(event['risk_score']):
+        logger.warning("Rejected threat event; missing or invalid fields: %s", missing or ['risk_score'])
+        return {
+            'statusCode': 400,
+            'body': orjson.dumps({
+                'error': 'Invalid threat event',
+                'missing_fields': missing,
+                'invalid_fields': [] if missing else ['risk_score']
+            }).decode()
+        }
+    
+    # One clock read per invocation, shared by every helper
+    now = datetime.utcnow()
     
     try:
         # Extract threat information
@@ -52,223 +135,302 @@ def lambda_handler(event, context):
         # Initialize response actions
         actions_taken = []
         
-        # Execute automated response based on threat type and risk score
-        if risk_score >= 9:
-            # Critical threat response
-            actions_taken.extend(handle_critical_threat(event))
-        elif risk_score >= 7:
-            # High threat response
-            actions_taken.extend(handle_high_threat(event))
-        else:
-            # Medium threat response
-            actions_taken.extend(handle_medium_threat(event))
+        # Execute automated response based on risk score
+        handler = _SCORE_HANDLERS[max(0, min(int(risk_score), 10))]
+        actions_taken.extend(handler(event, now=now))
         
         # Log response completion
-        logger.info(f"✅ Threat response completed for {event_id}: {len(actions_taken)} actions taken")
+        logger.info("✅ Threat response completed for %s: %d actions taken", event_id, len(actions_taken))
         
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': orjson.dumps({
                 'message': 'Threat response executed successfully',
                 'event_id': event_id,
                 'actions_taken': actions_taken,
-                'timestamp': datetime.utcnow().isoformat()
-            })
+                'timestamp': now.isoformat()
+            }).decode()
         }
         
     except Exception as e:
-        logger.error(f"❌ Error processing threat response: {str(e)}")
+        logger.error("❌ Error processing threat response: %s", e)
         return {
             'statusCode': 500,
-            'body': json.dumps({
+            'body': orjson.dumps({
                 'error': 'Failed to process threat response',
                 'details': str(e)
-            })
+            }).decode()
         }
-
-def handle_critical_threat(event):
-    """Handle critical security threats (risk score 9-10)"""
-    actions = []
-    source_ip = event.get('source_ip', 'unknown')
-    
-    try:
-        # Action 1: Immediate IP blocking
-        if source_ip != 'unknown' and not source_ip.startswith('10.') and not source_ip.startswith('192.168.'):
-            block_ip_address(source_ip)
-            actions.append(f"IP_BLOCKED: {source_ip}")
-        
-        # Action 2: Send emergency notifications
-        send_emergency_notification(event)
-        actions.append("EMERGENCY_NOTIFICATION_SENT")
-        
-        # Action 3: Create high-priority incident
-        incident_id = create_security_incident(event, priority='CRITICAL')
-        actions.append(f"INCIDENT_CREATED: {incident_id}")
-        
-        # Action 4: Log to CloudWatch for audit trail
-        log_security_action(event, actions, 'CRITICAL_RESPONSE')
-        actions.append("AUDIT_LOG_CREATED")
-        
-    except Exception as e:
-        logger.error(f"Error in critical threat handling: {e}")
-        actions.append(f"ERROR: {str(e)}")
     
-    return actions
+    finally:
+        # Send buffered logs before the environment is frozen
+        flush_logs()
 
-def handle_high_threat(event):
-    """Handle high security threats (risk score 7-8)"""
+def handle_threat(event, tier, now=None):
+    """Run each response step configured for a threat tier, stopping at the first error"""
     actions = []
+    now = now or datetime.utcnow()
+    context = {
+        'source_ip': event.get('source_ip', 'unknown'),
+        'now': now,
+        'now_iso': now.isoformat(),
+        'actions': actions
+    }
     
     try:
-        # Action 1: Rate limiting for source IP
-        source_ip = event.get('source_ip', 'unknown')
-        if source_ip != 'unknown':
-            apply_rate_limiting(source_ip)
-            actions.append(f"RATE_LIMITED: {source_ip}")
-        
-        # Action 2: Send security team notification
-        send_security_notification(event)
-        actions.append("SECURITY_TEAM_NOTIFIED")
-        
-        # Action 3: Create standard incident
-        incident_id = create_security_incident(event, priority='HIGH')
-        actions.append(f"INCIDENT_CREATED: {incident_id}")
+        for step in _TIERED_ACTIONS[tier]:
+            action = step(event, context)
+            if action:
+                actions.append(action)
         
     except Exception as e:
-        logger.error(f"Error in high threat handling: {e}")
+        logger.error("Error in %s threat handling: %s", tier, e)
         actions.append(f"ERROR: {str(e)}")
     
     return actions
 
-def handle_medium_threat(event):
-    """Handle medium security threats (risk score 5-6)"""
-    actions = []
-    
-    try:
-        # Action 1: Enhanced monitoring
-        enable_enhanced_monitoring(event.get('source_ip'))
-        actions.append("ENHANCED_MONITORING_ENABLED")
-        
-        # Action 2: Log for analysis
-        log_security_event(event)
-        actions.append("SECURITY_EVENT_LOGGED")
-        
-    except Exception as e:
-        logger.error(f"Error in medium threat handling: {e}")
-        actions.append(f"ERROR: {str(e)}")
-    
-    return actions
+# Response steps; each takes (event, context) and returns the action taken,
+# or None when the step does not apply to this event
+
+def _block_ip_step(event, context):
+    """Block the source IP unless it is unknown or internal"""
+    source_ip = context['source_ip']
+    # Internal traffic is never blocked
+    if source_ip != 'unknown' and not _PRIVATE_RE.match(source_ip):
+        block_ip_address(source_ip)
+        return f"IP_BLOCKED: {source_ip}"
+
+def _rate_limit_step(event, context):
+    """Rate-limit a known source IP"""
+    source_ip = context['source_ip']
+    if source_ip != 'unknown':
+        apply_rate_limiting(source_ip)
+        return f"RATE_LIMITED: {source_ip}"
+
+def _emergency_notification_step(event, context):
+    """Send the emergency SNS notification"""
+    send_emergency_notification(event, now_iso=context['now_iso'])
+    return "EMERGENCY_NOTIFICATION_SENT"
+
+def _security_notification_step(event, context):
+    """Notify the security team"""
+    send_security_notification(event)
+    return "SECURITY_TEAM_NOTIFIED"
+
+def _incident_step(priority):
+    """Step that creates an incident with the given priority"""
+    def step(event, context):
+        incident_id = create_security_incident(event, priority=priority, now=context['now'])
+        return f"INCIDENT_CREATED: {incident_id}"
+    return step
+
+def _audit_log_step(response_type):
+    """Step that records the actions taken so far in the audit log"""
+    def step(event, context):
+        log_security_action(event, context['actions'], response_type, now=context['now'])
+        return "AUDIT_LOG_CREATED"
+    return step
+
+def _enhanced_monitoring_step(event, context):
+    """Enable enhanced monitoring for the source IP"""
+    enable_enhanced_monitoring(context['source_ip'])
+    return "ENHANCED_MONITORING_ENABLED"
+
+def _log_event_step(event, context):
+    """Log the event for later analysis"""
+    log_security_event(event)
+    return "SECURITY_EVENT_LOGGED"
+
+_TIERED_ACTIONS = {
+    # Critical threats (risk score 9-10)
+    'critical': (
+        _block_ip_step,
+        _emergency_notification_step,
+        _incident_step('CRITICAL'),
+        _audit_log_step('CRITICAL_RESPONSE')
+    ),
+    # High threats (risk score 7-8)
+    'high': (
+        _rate_limit_step,
+        _security_notification_step,
+        _incident_step('HIGH')
+    ),
+    # Medium threats (risk score 5-6)
+    'medium': (
+        _enhanced_monitoring_step,
+        _log_event_step
+    )
+}
+
+# Response handler per whole risk score 0-10: medium below 7, high for 7-8,
+# critical for 9-10
+_SCORE_HANDLERS = (
+    [partial(handle_threat, tier='medium')] * 7 +
+    [partial(handle_threat, tier='high')] * 2 +
+    [partial(handle_threat, tier='critical')] * 2
+)
 
 def block_ip_address(ip_address):
     """Block malicious IP address using AWS Security Groups"""
     try:
-        ec2 = boto3.client('ec2')
-        
-        # This would add the IP to a blacklist security group
+        # This would add the IP to a blacklist security group via
+        # get_client('ec2')
         # Implementation depends on your AWS infrastructure setup
-        logger.info(f"🚫 IP address blocked: {ip_address}")
+        logger.info("🚫 IP address blocked: %s", ip_address)
         
     except Exception as e:
-        logger.error(f"Failed to block IP {ip_address}: {e}")
+        logger.error("Failed to block IP %s: %s", ip_address, e)
         raise
 
-def send_emergency_notification(event):
+def send_emergency_notification(event, now_iso=None):
     """Send emergency notification via SNS"""
     try:
-        sns = boto3.client('sns')
-        
         message = {
             "alert": "CRITICAL SECURITY THREAT DETECTED",
             "threat_type": event.get('threat_type'),
             "source_ip": event.get('source_ip'),
             "risk_score": event.get('risk_score'),
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now_iso or datetime.utcnow().isoformat(),
             "automated_response": "ACTIVE"
         }
         
-        # Replace with your SNS topic ARN
-        topic_arn = "arn:aws:sns:us-east-2:YOUR_ACCOUNT:aegis-emergency-alerts"
+        # Published once AEGIS_SNS_TOPIC_ARN is configured
+        if SNS_TOPIC_ARN:
+            get_client('sns').publish(
+                TopicArn=SNS_TOPIC_ARN,
+                Message=orjson.dumps(message).decode(),
+                Subject="🚨 AEGIS: Critical Security Threat Detected"
+            )
         
-        # Uncomment when SNS topic is configured
-        # sns.publish(
-        #     TopicArn=topic_arn,
-        #     Message=json.dumps(message),
-        #     Subject="🚨 AEGIS: Critical Security Threat Detected"
-        # )
-        
-        logger.info(f"📧 Emergency notification sent for threat: {event.get('event_id')}")
+        logger.info("📧 Emergency notification sent for threat: %s", event.get('event_id'))
         
     except Exception as e:
-        logger.error(f"Failed to send emergency notification: {e}")
+        logger.error("Failed to send emergency notification: %s", e)
         raise
 
 def send_security_notification(event):
     """Send standard security notification"""
     try:
         # Implementation for security team notifications
-        logger.info(f"📨 Security notification sent for event: {event.get('event_id')}")
+        logger.info("📨 Security notification sent for event: %s", event.get('event_id'))
         
     except Exception as e:
-        logger.error(f"Failed to send security notification: {e}")
+        logger.error("Failed to send security notification: %s", e)
         raise
 
-def create_security_incident(event, priority='MEDIUM'):
+def create_security_incident(event, priority='MEDIUM', now=None):
     """Create security incident record"""
     try:
         # This would integrate with your incident management system
-        incident_id = f"INC-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+        # Timestamp plus sequence keeps IDs unique within the same second
+        incident_id = f"INC-{(now or datetime.utcnow()).strftime('%Y%m%d%H%M%S')}-{next(_incident_ids)}"
         
-        logger.info(f"🎫 Security incident created: {incident_id} (Priority: {priority})")
+        logger.info("🎫 Security incident created: %s (Priority: %s)", incident_id, priority)
         return incident_id
         
     except Exception as e:
-        logger.error(f"Failed to create security incident: {e}")
+        logger.error("Failed to create security incident: %s", e)
         raise
 
 def apply_rate_limiting(ip_address):
     """Apply rate limiting to suspicious IP"""
     try:
         # Implementation depends on your rate limiting solution
-        logger.info(f"🚦 Rate limiting applied to: {ip_address}")
+        logger.info("🚦 Rate limiting applied to: %s", ip_address)
         
     except Exception as e:
-        logger.error(f"Failed to apply rate limiting: {e}")
+        logger.error("Failed to apply rate limiting: %s", e)
         raise
 
 def enable_enhanced_monitoring(ip_address):
     """Enable enhanced monitoring for suspicious activity"""
     try:
-        logger.info(f"👁️  Enhanced monitoring enabled for: {ip_address}")
+        logger.info("👁️  Enhanced monitoring enabled for: %s", ip_address)
         
     except Exception as e:
-        logger.error(f"Failed to enable enhanced monitoring: {e}")
+        logger.error("Failed to enable enhanced monitoring: %s", e)
         raise
 
-def log_security_action(event, actions, response_type):
+def log_security_action(event, actions, response_type, now=None):
     """Log security actions to CloudWatch"""
     try:
-        cloudwatch = boto3.client('logs')
-        
+        now = now or datetime.utcnow()
         log_entry = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': now.isoformat(),
             'event_id': event.get('event_id'),
             'response_type': response_type,
             'actions_taken': actions,
             'threat_data': event
         }
         
-        # Log to CloudWatch Logs
-        # Implementation depends on your log group configuration
-        logger.info(f"📝 Security action logged: {response_type}")
+        # Buffer for CloudWatch Logs; a full batch is sent right away
+        if LOG_GROUP:
+            _log_buffer.append({
+                'timestamp': int(now.replace(tzinfo=timezone.utc).timestamp() * 1000),
+                'message': orjson.dumps(log_entry, default=str).decode()
+            })
+            if len(_log_buffer) >= LOG_BATCH_SIZE:
+                flush_logs()
+        
+        logger.info("📝 Security action logged: %s", response_type)
+        
+    except Exception as e:
+        logger.error("Failed to log security action: %s", e)
+
+def flush_logs():
+    """Send buffered security action records in one put_log_events call"""
+    if not _log_buffer:
+        return
+    
+    log_events = list(_log_buffer)
+    _log_buffer.clear()
+    
+    try:
+        logs = get_client('logs')
+        try:
+            logs.put_log_events(logGroupName=LOG_GROUP, logStreamName=LOG_STREAM, logEvents=log_events)
+        except logs.exceptions.ResourceNotFoundException:
+            # First write to this group/stream; create it and retry once
+            try:
+                logs.create_log_group(logGroupName=LOG_GROUP)
+            except logs.exceptions.ResourceAlreadyExistsException:
+                pass
+            try:
+                logs.create_log_stream(logGroupName=LOG_GROUP, logStreamName=LOG_STREAM)
+            except logs.exceptions.ResourceAlreadyExistsException:
+                pass
+            logs.put_log_events(logGroupName=LOG_GROUP, logStreamName=LOG_STREAM, logEvents=log_events)
         
     except Exception as e:
-        logger.error(f"Failed to log security action: {e}")
+        logger.error("Failed to send %d security action logs: %s", len(log_events), e)
 
 def log_security_event(event):
     """Log security event for analysis"""
     try:
-        logger.info(f"📊 Security event logged for analysis: {event.get('event_id')}")
+        logger.info("📊 Security event logged for analysis: %s", event.get('event_id'))
         
     except Exception as e:
-        logger.error(f"Failed to log security event: {e}")
-        raise
\ No newline at end of file
+        logger.error("Failed to log security event: %s", e)
+        raise
+
+
+def _init():
+    """
+    One-time, deterministic setup run at import.
+    
+    Under SnapStart (AWS_LAMBDA_INITIALIZATION_TYPE=snap-start) the
+    environment is snapshotted after import, so the configured AWS clients
+    are built here and restored with their loaded service models instead
+    of being created on the first critical threat. Nothing here makes a
+    network call or draws randomness, keeping the snapshot restore-safe.
+    Without SnapStart, clients stay lazy (see get_client).
+    """
+    if os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') != 'snap-start':
+        return
+    
+    if SNS_TOPIC_ARN:
+        get_client('sns')
+    if LOG_GROUP:
+        get_client('logs')
+
+_init()
@@ -4,19 +4,51 @@ Aegis Cloud Security System - Main Execution Loop
 A simplified proof-of-concept automated cloud security monitoring system.
 """
 
-import time
+import asyncio
+import concurrent.futures
+import json
+import os
 import logging
 from event_generator import CloudEventGenerator
 from security_monitor import SecurityMonitor
 from response_handler import ResponseHandler
 
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON line for CloudWatch Logs Insights."""
+    
+    def format(self, record):
+        entry = {
+            'timestamp': self.formatTime(record, self.datefmt),
+            'logger': record.name,
+            'level': record.levelname
+        }
+        message = record.getMessage()
+        try:
+            # Structured records (e.g. response actions) are merged in as fields
+            payload = json.loads(message)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict):
+            # Envelope fields win over same-named payload fields
+            entry = {**payload, **entry}
+        else:
+            entry['message'] = message
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry)
+
 def setup_logging():
-    """Configure logging for the Aegis system."""
+    """Configure logging for the Aegis system (JSON lines if AEGIS_LOG_FORMAT=json)."""
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+    if os.environ.get('AEGIS_LOG_FORMAT') == 'json':
+        for handler in logging.getLogger().handlers:
+            handler.setFormatter(JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S'))
     return logging.getLogger('Aegis')
 
 def main():
@@ -34,7 +66,7 @@ def main():
     # Log AWS integration status
     aws_status = security_monitor.get_aws_health_status()
     if aws_status['cloudwatch_available']:
-        logger.info(f"☁️  AWS CloudWatch integration active (Region: {aws_status['aws_region']})")
+        logger.info("☁️  AWS CloudWatch integration active (Region: %s)", aws_status['aws_region'])
     else:
         logger.warning("⚠️  AWS CloudWatch integration unavailable")
     
@@ -47,42 +79,75 @@ def main():
     print("Status: ACTIVE - Monitoring cloud environment...")
     print("Press Ctrl+C to stop monitoring\n")
     
-    event_count = 0
-    threat_count = 0
+    counts = {'events': 0, 'threats': 0}
     
     try:
+        asyncio.run(monitor(event_generator, security_monitor, response_handler, counts))
         
-        while True:
-            # Generate a mock security event
-            event = event_generator.generate_event()
-            event_count += 1
+    except KeyboardInterrupt:
+        event_count, threat_count = counts['events'], counts['threats']
+        print(f"\n🛑 Monitoring stopped by user")
+        print(f"📈 Final Statistics:")
+        print(f"   • Total events processed: {event_count}")
+        print(f"   • Total threats detected: {threat_count}")
+        if event_count > 0:
+            print(f"   • Success rate: {((event_count - threat_count) / event_count * 100):.1f}% normal events")
+        logger.info("Aegis system shutdown completed")
+
+async def monitor(event_generator, security_monitor, response_handler, counts):
+    """
+    Event loop for continuous monitoring.
+    
+    Threat responses run on a dedicated worker thread, so the next events are
+    generated and analyzed while a response is still executing.
+    """
+    logger = logging.getLogger('Aegis')
+    
+    # Interval between events (AEGIS_POLL_INTERVAL); 0 runs as fast as analysis allows
+    poll_interval = float(os.environ.get('AEGIS_POLL_INTERVAL', '1.5'))
+    # Pause after each threat response (AEGIS_RESPONSE_DELAY); 0, the default, skips it
+    response_delay = float(os.environ.get('AEGIS_RESPONSE_DELAY', '0'))
+    
+    # One worker keeps responses ordered and ResponseHandler single-threaded
+    loop = asyncio.get_running_loop()
+    response_executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix='aegis-response'
+    )
+    pending_responses = set()
+    
+    def response_done(future):
+        pending_responses.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("❌ Threat response failed", exc_info=future.exception())
+    
+    try:
+        async for event in event_generator.stream_events(poll_interval):
+            counts['events'] += 1
             
             # Process the event through security monitoring
             threat_detected = security_monitor.analyze_event(event)
             
             if threat_detected:
-                threat_count += 1
-                # Trigger automated response
-                response_handler.handle_threat(threat_detected, event)
+                counts['threats'] += 1
+                # Trigger automated response without blocking the loop
+                response = loop.run_in_executor(response_executor, response_handler.handle_threat,
+                                                threat_detected, event)
+                pending_responses.add(response)
+                response.add_done_callback(response_done)
                 
                 # Add some delay after threat response
-                time.sleep(2)
+                if response_delay:
+                    await asyncio.sleep(response_delay)
             
             # Display monitoring status periodically
-            if event_count % 10 == 0:
-                print(f"📊 Status: {event_count} events processed, {threat_count} threats detected")
-            
-            # Wait before processing next event (simulate realistic monitoring interval)
-            time.sleep(1.5)
-            
-    except KeyboardInterrupt:
-        print(f"\n🛑 Monitoring stopped by user")
-        print(f"📈 Final Statistics:")
-        print(f"   • Total events processed: {event_count}")
-        print(f"   • Total threats detected: {threat_count}")
-        if event_count > 0:
-            print(f"   • Success rate: {((event_count - threat_count) / event_count * 100):.1f}% normal events")
-        logger.info("Aegis system shutdown completed")
+            if counts['events'] % 10 == 0:
+                print(f"📊 Status: {counts['events']} events processed, {counts['threats']} threats detected")
+    
+    finally:
+        # Let in-flight responses finish before reporting final statistics
+        if pending_responses:
+            await asyncio.gather(*pending_responses, return_exceptions=True)
+        response_executor.shutdown(wait=True)
 
 if __name__ == "__main__":
     main()
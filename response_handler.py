@@ -4,10 +4,28 @@ Response Handler Module for Aegis Cloud Security System
 Implements automated responses to detected security threats.
 """
 
+import concurrent.futures
+import itertools
+import json
 import logging
+import os
 import time
 import random
+from collections import Counter, deque
 from datetime import datetime
+from types import MappingProxyType
+
+# Sequential IDs are unique per process and traceable across log lines;
+# next() on itertools.count is atomic
+_response_ids = itertools.count(1)
+_ticket_ids = itertools.count(10001)
+
+# Default response configuration for unknown threat types
+_DEFAULT_RESPONSE = MappingProxyType({
+    "actions": ("log_incident", "alert_security_team", "increase_monitoring"),
+    "priority": "medium",
+    "escalation_required": True
+})
 
 class ResponseHandler:
     """
@@ -15,61 +33,103 @@ class ResponseHandler:
     based on the type and severity of detected security threats.
     """
     
+    # Response action configurations based on threat types (read-only,
+    # shared by every instance)
+    response_actions = MappingProxyType({
+        "KEYWORD_THREAT": MappingProxyType({
+            "actions": ("quarantine_session", "alert_security_team", "log_incident"),
+            "priority": "high",
+            "escalation_required": True
+        }),
+        "MALICIOUS_IP": MappingProxyType({
+            "actions": ("block_ip", "terminate_connections", "alert_security_team"),
+            "priority": "high", 
+            "escalation_required": True
+        }),
+        "HIGH_RISK_USER": MappingProxyType({
+            "actions": ("suspend_user", "audit_user_activity", "notify_admin"),
+            "priority": "medium",
+            "escalation_required": True
+        }),
+        "RESTRICTED_RESOURCE_ACCESS": MappingProxyType({
+            "actions": ("block_access", "isolate_resource", "alert_security_team"),
+            "priority": "high",
+            "escalation_required": True
+        }),
+        "BRUTE_FORCE_ATTACK": MappingProxyType({
+            "actions": ("block_ip", "lockout_account", "increase_monitoring"),
+            "priority": "high",
+            "escalation_required": True
+        }),
+        "CRITICAL_SECURITY_EVENT": MappingProxyType({
+            "actions": ("emergency_isolation", "executive_notification", "forensic_imaging"),
+            "priority": "critical",
+            "escalation_required": True
+        }),
+        "HIGH_RISK_EVENT": MappingProxyType({
+            "actions": ("increase_monitoring", "isolate_affected_systems", "alert_security_team"),
+            "priority": "high",
+            "escalation_required": True
+        }),
+        "SUSPICIOUS_ACTIVITY": MappingProxyType({
+            "actions": ("increase_monitoring", "log_for_analysis", "notify_admin"),
+            "priority": "medium",
+            "escalation_required": False
+        }),
+        "THREAT_INDICATORS_DETECTED": MappingProxyType({
+            "actions": ("quarantine_system", "deep_scan", "alert_security_team"),
+            "priority": "high",
+            "escalation_required": True
+        })
+    })
+    
     def __init__(self):
         """Initialize the response handler with response configurations."""
         self.logger = logging.getLogger('Aegis.ResponseHandler')
         
-        # Response action configurations based on threat types
-        self.response_actions = {
-            "KEYWORD_THREAT": {
-                "actions": ["quarantine_session", "alert_security_team", "log_incident"],
-                "priority": "high",
-                "escalation_required": True
-            },
-            "MALICIOUS_IP": {
-                "actions": ["block_ip", "terminate_connections", "alert_security_team"],
-                "priority": "high", 
-                "escalation_required": True
-            },
-            "HIGH_RISK_USER": {
-                "actions": ["suspend_user", "audit_user_activity", "notify_admin"],
-                "priority": "medium",
-                "escalation_required": True
-            },
-            "RESTRICTED_RESOURCE_ACCESS": {
-                "actions": ["block_access", "isolate_resource", "alert_security_team"],
-                "priority": "high",
-                "escalation_required": True
-            },
-            "BRUTE_FORCE_ATTACK": {
-                "actions": ["block_ip", "lockout_account", "increase_monitoring"],
-                "priority": "high",
-                "escalation_required": True
-            },
-            "CRITICAL_SECURITY_EVENT": {
-                "actions": ["emergency_isolation", "executive_notification", "forensic_imaging"],
-                "priority": "critical",
-                "escalation_required": True
-            },
-            "HIGH_RISK_EVENT": {
-                "actions": ["increase_monitoring", "isolate_affected_systems", "alert_security_team"],
-                "priority": "high",
-                "escalation_required": True
-            },
-            "SUSPICIOUS_ACTIVITY": {
-                "actions": ["increase_monitoring", "log_for_analysis", "notify_admin"],
-                "priority": "medium",
-                "escalation_required": False
-            },
-            "THREAT_INDICATORS_DETECTED": {
-                "actions": ["quarantine_system", "deep_scan", "alert_security_team"],
-                "priority": "high",
-                "escalation_required": True
-            }
+        # Simulated per-action delay in seconds for demos; 0 skips the sleeps
+        self._delay = float(os.environ.get('AEGIS_ACTION_DELAY', '0'))
+        
+        # Display titles for every configured action, built once
+        self._pretty_action = {
+            action: action.replace('_', ' ').title()
+            for config in (*self.response_actions.values(), _DEFAULT_RESPONSE)
+            for action in config["actions"]
+        }
+        
+        # Action simulations, all called as handler(event, threat_info)
+        self._action_table = {
+            "block_ip": self._simulate_ip_block,
+            "suspend_user": self._simulate_user_suspension,
+            "quarantine_session": self._simulate_session_quarantine,
+            "alert_security_team": self._simulate_security_alert,
+            "terminate_connections": self._simulate_connection_termination,
+            "isolate_resource": self._simulate_resource_isolation,
+            "lockout_account": self._simulate_account_lockout,
+            "increase_monitoring": self._simulate_monitoring_increase,
+            "emergency_isolation": self._simulate_emergency_isolation,
+            "forensic_imaging": self._simulate_forensic_imaging,
+            "deep_scan": self._simulate_deep_scan,
+            "audit_user_activity": self._simulate_user_audit,
+            "log_incident": self._simulate_incident_logging,
+            "notify_admin": self._simulate_admin_notification,
+            "executive_notification": self._simulate_executive_notification
         }
         
-        # Response execution tracking
-        self.response_history = []
+        # Worker threads for response actions, shared by every threat
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix='aegis-action'
+        )
+        
+        # Response execution tracking; history is bounded so warm processes
+        # don't grow without limit, while the counters cover every response
+        self.response_history = deque(maxlen=int(os.environ.get('AEGIS_HISTORY_MAX', '1000')))
+        self._stats = {
+            "total": 0,
+            "by_threat_type": Counter(),
+            "by_priority": Counter(),
+            "escalations": 0
+        }
         self.active_responses = {}
     
     def handle_threat(self, threat_info, original_event):
@@ -87,13 +147,21 @@ class ResponseHandler:
         threat_type = threat_info.get("threat_type")
         risk_score = threat_info.get("risk_score", 0)
         
-        print(f"\n🚫 INITIATING AUTOMATED RESPONSE")
-        print(f"   Threat Type: {threat_type}")
-        print(f"   Risk Score: {risk_score}/10")
-        print(f"   Event ID: {original_event.get('event_id')}")
+        event_id = original_event.get("event_id")
+        response_id = f"RSP_{next(_response_ids):04d}"
+        log_info = self.logger.isEnabledFor(logging.INFO)
+        
+        if log_info:
+            self.logger.info(json.dumps({
+                "type": "response_started",
+                "response_id": response_id,
+                "event_id": event_id,
+                "threat_type": threat_type,
+                "risk_score": risk_score
+            }))
         
         # Get response configuration for this threat type
-        response_config = self.response_actions.get(threat_type, self._get_default_response())
+        response_config = self.response_actions.get(threat_type, _DEFAULT_RESPONSE)
         
         # Execute response actions
         self._execute_response_actions(response_config, threat_info, original_event)
@@ -105,134 +173,132 @@ class ResponseHandler:
         if response_config.get("escalation_required", False):
             self._escalate_incident(threat_info, original_event)
         
-        print(f"✅ THREAT RESPONSE COMPLETED")
-        print(f"   Response ID: RSP_{random.randint(1000, 9999)}")
-        print(f"   Actions Executed: {len(response_config['actions'])}")
-        print("-" * 50)
+        if log_info:
+            self.logger.info(json.dumps({
+                "type": "response_completed",
+                "response_id": response_id,
+                "event_id": event_id,
+                "threat_type": threat_type,
+                "actions_executed": len(response_config["actions"])
+            }))
     
     def _execute_response_actions(self, response_config, threat_info, event):
-        """Execute the specific response actions for a threat."""
+        """Execute the specific response actions for a threat concurrently."""
         actions = response_config.get("actions", [])
         
-        for action in actions:
-            print(f"   🔧 Executing: {action.replace('_', ' ').title()}")
-            
-            # Simulate action execution with realistic delays
-            self._simulate_action_execution(action, threat_info, event)
-            
-            # Brief delay between actions for realism
-            time.sleep(0.5)
+        # Actions are independent, so their latencies overlap
+        futures = [
+            self._pool.submit(self._run_action, action, threat_info, event)
+            for action in actions
+        ]
+        
+        # Emit one structured record per action, in configured order
+        for action, future in zip(actions, futures):
+            result = future.result()
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(json.dumps({
+                    "type": "response_action",
+                    "action": action,
+                    "title": self._pretty_action.get(action, action),
+                    "event_id": event.get("event_id"),
+                    "threat_type": threat_info.get("threat_type"),
+                    **result
+                }))
     
-    def _simulate_action_execution(self, action, threat_info, event):
-        """Simulate the execution of a specific response action."""
+    def _run_action(self, action, threat_info, event):
+        """Run one action on a pool thread, including its simulated latency."""
+        result = self._simulate_action_execution(action, threat_info, event)
         
-        action_simulations = {
-            "block_ip": lambda: self._simulate_ip_block(event.get("source_ip")),
-            "suspend_user": lambda: self._simulate_user_suspension(event.get("user_id")),
-            "quarantine_session": lambda: self._simulate_session_quarantine(event.get("metadata", {}).get("session_id")),
-            "alert_security_team": lambda: self._simulate_security_alert(threat_info),
-            "terminate_connections": lambda: self._simulate_connection_termination(event.get("source_ip")),
-            "isolate_resource": lambda: self._simulate_resource_isolation(event.get("resource")),
-            "lockout_account": lambda: self._simulate_account_lockout(event.get("user_id")),
-            "increase_monitoring": lambda: self._simulate_monitoring_increase(event.get("user_id")),
-            "emergency_isolation": lambda: self._simulate_emergency_isolation(event),
-            "forensic_imaging": lambda: self._simulate_forensic_imaging(event.get("resource")),
-            "deep_scan": lambda: self._simulate_deep_scan(event.get("source_ip")),
-            "audit_user_activity": lambda: self._simulate_user_audit(event.get("user_id")),
-            "log_incident": lambda: self._simulate_incident_logging(threat_info, event),
-            "notify_admin": lambda: self._simulate_admin_notification(threat_info),
-            "executive_notification": lambda: self._simulate_executive_notification(threat_info)
-        }
+        # Optional delay standing in for the action's real latency
+        if self._delay:
+            time.sleep(self._delay)
         
-        # Execute the specific action simulation
-        simulation_func = action_simulations.get(action, lambda: print(f"     Action '{action}' executed successfully"))
-        simulation_func()
+        return result
     
-    def _simulate_ip_block(self, ip_address):
+    def _simulate_action_execution(self, action, threat_info, event):
+        """Simulate the execution of a specific response action and return its result."""
+        simulation_func = self._action_table.get(action)
+        if simulation_func:
+            return simulation_func(event, threat_info)
+        return {"status": "executed"}
+    
+    def _simulate_ip_block(self, event, threat_info):
         """Simulate blocking an IP address."""
-        print(f"     🚫 IP {ip_address} added to firewall block list")
-        print(f"     🛡️  All traffic from {ip_address} now blocked")
+        return {"status": "blocked", "ip_address": event.get("source_ip"), "control": "firewall_block_list"}
     
-    def _simulate_user_suspension(self, user_id):
+    def _simulate_user_suspension(self, event, threat_info):
         """Simulate suspending a user account."""
-        print(f"     👤 User account '{user_id}' suspended immediately")
-        print(f"     🔒 All active sessions for {user_id} terminated")
+        return {"status": "suspended", "user_id": event.get("user_id"), "sessions_terminated": True}
     
-    def _simulate_session_quarantine(self, session_id):
+    def _simulate_session_quarantine(self, event, threat_info):
         """Simulate quarantining a user session."""
-        print(f"     🔒 Session {session_id} isolated in secure quarantine")
-        print(f"     📊 Session activities logged for forensic analysis")
+        return {
+            "status": "quarantined",
+            "session_id": event.get("metadata", {}).get("session_id"),
+            "forensic_logging": True
+        }
     
-    def _simulate_security_alert(self, threat_info):
+    def _simulate_security_alert(self, event, threat_info):
         """Simulate alerting the security team."""
-        print(f"     📧 Security team notified via multiple channels")
-        print(f"     🚨 Incident ticket #{random.randint(10000, 99999)} created")
+        return {"status": "notified", "channels": "multiple", "ticket_id": next(_ticket_ids)}
     
-    def _simulate_connection_termination(self, ip_address):
+    def _simulate_connection_termination(self, event, threat_info):
         """Simulate terminating network connections."""
-        connection_count = random.randint(1, 5)
-        print(f"     🔌 {connection_count} active connections from {ip_address} terminated")
-        print(f"     🛡️  Connection attempts from {ip_address} now rejected")
+        return {
+            "status": "terminated",
+            "ip_address": event.get("source_ip"),
+            "connections_terminated": random.randint(1, 5),
+            "new_connections": "rejected"
+        }
     
-    def _simulate_resource_isolation(self, resource):
+    def _simulate_resource_isolation(self, event, threat_info):
         """Simulate isolating a compromised resource."""
-        print(f"     🏥 Resource '{resource}' moved to isolated security zone")
-        print(f"     🔍 Comprehensive security scan initiated for {resource}")
+        return {"status": "isolated", "resource": event.get("resource"), "security_scan": "initiated"}
     
-    def _simulate_account_lockout(self, user_id):
+    def _simulate_account_lockout(self, event, threat_info):
         """Simulate locking out a user account."""
-        lockout_duration = random.randint(15, 60)
-        print(f"     🔐 Account '{user_id}' locked for {lockout_duration} minutes")
-        print(f"     🚫 Password reset required for account reactivation")
+        return {
+            "status": "locked",
+            "user_id": event.get("user_id"),
+            "lockout_minutes": random.randint(15, 60),
+            "password_reset_required": True
+        }
     
-    def _simulate_monitoring_increase(self, target):
+    def _simulate_monitoring_increase(self, event, threat_info):
         """Simulate increasing monitoring on a target."""
-        print(f"     👁️  Enhanced monitoring activated for '{target}'")
-        print(f"     📈 Monitoring sensitivity increased by 200%")
+        return {"status": "enhanced", "target": event.get("user_id"), "sensitivity_increase_pct": 200}
     
-    def _simulate_emergency_isolation(self, event):
+    def _simulate_emergency_isolation(self, event, threat_info):
         """Simulate emergency isolation procedures."""
-        print(f"     🚨 EMERGENCY ISOLATION PROTOCOL ACTIVATED")
-        print(f"     🏥 Affected systems moved to secure quarantine network")
-        print(f"     📞 C-level executives and incident response team notified")
+        return {
+            "status": "isolated",
+            "network": "secure_quarantine",
+            "notified": ["executives", "incident_response_team"]
+        }
     
-    def _simulate_forensic_imaging(self, resource):
+    def _simulate_forensic_imaging(self, event, threat_info):
         """Simulate creating forensic images."""
-        print(f"     💾 Creating forensic image of '{resource}'")
-        print(f"     🔍 Evidence preservation procedures initiated")
+        return {"status": "imaging", "resource": event.get("resource"), "evidence_preservation": True}
     
-    def _simulate_deep_scan(self, target):
+    def _simulate_deep_scan(self, event, threat_info):
         """Simulate deep security scanning."""
-        print(f"     🔍 Initiating comprehensive security scan of {target}")
-        print(f"     🦠 Malware signature database updated for scan")
+        return {"status": "scanning", "target": event.get("source_ip"), "signatures_updated": True}
     
-    def _simulate_user_audit(self, user_id):
+    def _simulate_user_audit(self, event, threat_info):
         """Simulate auditing user activities."""
-        print(f"     📋 Full activity audit initiated for user '{user_id}'")
-        print(f"     📊 Analyzing 30-day activity history")
+        return {"status": "auditing", "user_id": event.get("user_id"), "history_days": 30}
     
-    def _simulate_incident_logging(self, threat_info, event):
+    def _simulate_incident_logging(self, event, threat_info):
         """Simulate logging incident details."""
-        print(f"     📝 Detailed incident report generated")
-        print(f"     💾 Evidence and logs preserved for investigation")
+        return {"status": "logged", "incident_report": True, "evidence_preserved": True}
     
-    def _simulate_admin_notification(self, threat_info):
+    def _simulate_admin_notification(self, event, threat_info):
         """Simulate notifying administrators."""
-        print(f"     👨‍💼 System administrators notified via email and SMS")
-        print(f"     📱 Mobile push notifications sent to on-call staff")
+        return {"status": "notified", "channels": ["email", "sms", "push"]}
     
-    def _simulate_executive_notification(self, threat_info):
+    def _simulate_executive_notification(self, event, threat_info):
         """Simulate notifying executive leadership."""
-        print(f"     🏢 Executive leadership briefing scheduled")
-        print(f"     📊 Executive dashboard updated with incident status")
-    
-    def _get_default_response(self):
-        """Get default response configuration for unknown threat types."""
-        return {
-            "actions": ["log_incident", "alert_security_team", "increase_monitoring"],
-            "priority": "medium",
-            "escalation_required": True
-        }
+        return {"status": "notified", "briefing": "scheduled", "dashboard_updated": True}
     
     def _log_response(self, threat_info, event, response_config):
         """Log the executed response for audit purposes."""
@@ -241,55 +307,56 @@ class ResponseHandler:
             "threat_type": threat_info.get("threat_type"),
             "event_id": event.get("event_id"),
             "risk_score": threat_info.get("risk_score"),
-            "actions_executed": response_config.get("actions", []),
+            "actions_executed": list(response_config.get("actions", ())),
             "priority": response_config.get("priority"),
             "escalation_required": response_config.get("escalation_required")
         }
         
         self.response_history.append(response_record)
-        self.logger.info(f"Response executed for {threat_info.get('threat_type')}")
+        
+        # Keep statistics current as responses are logged
+        stats = self._stats
+        stats["total"] += 1
+        stats["by_threat_type"][response_record["threat_type"]] += 1
+        stats["by_priority"][response_record["priority"]] += 1
+        if response_record["escalation_required"]:
+            stats["escalations"] += 1
+        
+        self.logger.info("Response executed for %s", threat_info.get('threat_type'))
     
     def _escalate_incident(self, threat_info, event):
         """Handle incident escalation procedures."""
-        print(f"   📈 ESCALATING INCIDENT")
-        print(f"     🚨 High-priority incident escalation initiated")
-        print(f"     👥 Incident response team activated")
-        print(f"     📞 Emergency contact procedures initiated")
+        # Simulate escalation delay (twice the per-action delay)
+        if self._delay:
+            time.sleep(self._delay * 2)
         
-        # Simulate escalation delay
-        time.sleep(1)
-        
-        print(f"     ✅ Escalation procedures completed")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(json.dumps({
+                "type": "incident_escalation",
+                "event_id": event.get("event_id"),
+                "threat_type": threat_info.get("threat_type"),
+                "status": "completed",
+                "activated": ["incident_response_team", "emergency_contacts"]
+            }))
     
     def get_response_statistics(self):
         """Get statistics about response activities."""
-        if not self.response_history:
+        stats = self._stats
+        if not stats["total"]:
             return {"total_responses": 0}
         
-        stats = {
-            "total_responses": len(self.response_history),
-            "by_threat_type": {},
-            "by_priority": {},
-            "escalations": 0
+        return {
+            "total_responses": stats["total"],
+            "by_threat_type": dict(stats["by_threat_type"]),
+            "by_priority": dict(stats["by_priority"]),
+            "escalations": stats["escalations"]
         }
-        
-        for record in self.response_history:
-            # Count by threat type
-            threat_type = record.get("threat_type", "unknown")
-            stats["by_threat_type"][threat_type] = stats["by_threat_type"].get(threat_type, 0) + 1
-            
-            # Count by priority
-            priority = record.get("priority", "unknown")
-            stats["by_priority"][priority] = stats["by_priority"].get(priority, 0) + 1
-            
-            # Count escalations
-            if record.get("escalation_required", False):
-                stats["escalations"] += 1
-        
-        return stats
     
     def clear_response_history(self):
         """Clear response history (for maintenance or testing)."""
         self.response_history.clear()
         self.active_responses.clear()
+        self._stats["total"] = self._stats["escalations"] = 0
+        self._stats["by_threat_type"].clear()
+        self._stats["by_priority"].clear()
         self.logger.info("Response history cleared")
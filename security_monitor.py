@@ -4,11 +4,72 @@ Security Monitor Module for Aegis Cloud Security System
 Analyzes events for potential security threats based on predefined rules.
 """
 
+import atexit
+import functools
+import ipaddress
 import logging
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import NamedTuple
 from datetime import datetime
-import json
+from types import MappingProxyType
+try:
+    import ahocorasick
+except ImportError:  # fall back to a combined stdlib regex
+    ahocorasick = None
 from aws_integration import AWSIntegration
 
+# Threat severity levels
+SEVERITY_LEVELS = MappingProxyType({
+    "info": 1,
+    "warning": 2,
+    "high": 3,
+    "critical": 4
+})
+
+class SecurityEvent(NamedTuple):
+    """Read-only view of the event fields used by the threat checks."""
+    event_id: str
+    event_type: str
+    user_id: str
+    source_ip: str
+    resource: str
+    severity: str = "info"
+    description: str = ""
+    threat_indicators: tuple = ()
+    
+    @classmethod
+    def from_dict(cls, event):
+        """Build from an event dict, applying the same defaults the checks used."""
+        get = event.get
+        return cls(
+            get("event_id"),
+            get("event_type"),
+            get("user_id"),
+            get("source_ip"),
+            get("resource"),
+            get("severity", "info"),
+            get("description", ""),
+            # None (or any falsy value) means no indicators
+            tuple(get("threat_indicators") or ())
+        )
+
+# Display label per whole risk score 0-10
+_RISK_LABELS = ("🟠 MEDIUM",) * 6 + ("🟡 HIGH",) * 2 + ("🔴 CRITICAL",) * 3
+
+# Risk score by number of threat indicators: min(10, 5 + 2n)
+_INDICATOR_RISK = tuple(min(10, 5 + count * 2) for count in range(16))
+
+# Field order of the threat tuples returned by the memoized rule checks
+_THREAT_FIELDS = ("threat_type", "description", "risk_score", "detection_method")
+
+def _threat(match):
+    """Build a fresh threat dict from a cached match tuple, or None."""
+    return dict(zip(_THREAT_FIELDS, match)) if match else None
+
 class SecurityMonitor:
     """
     Core security monitoring engine that analyzes events for potential threats.
@@ -22,38 +83,84 @@ class SecurityMonitor:
         # Initialize AWS integration
         self.aws_integration = AWSIntegration()
         
-        # Failed login attempt tracking
-        self.failed_login_attempts = {}
+        # AWS deliveries run on a background thread so analyze_event never
+        # waits on network calls (e.g. create_log_stream); items still queued
+        # at exit are delivered before AWSIntegration's own final flush
+        self._aws_queue = queue.Queue(maxsize=10000)
+        self._created_streams = set()
+        self._ts_cache = (float('-inf'), "", "")
+        self._aws_thread = threading.Thread(
+            target=self._aws_dispatch_loop, name='aegis-aws-dispatch', daemon=True
+        )
+        self._aws_thread.start()
+        atexit.register(self._drain_aws_queue)
+        
+        # Failed login attempt tracking: attempt times per user@ip, pruned to a
+        # sliding window; least recently seen keys are evicted once the table
+        # is full and each key keeps at most max_attempts_per_login times
+        self.failed_login_attempts = OrderedDict()
         self.max_failed_attempts = 3
+        self.failed_login_window = 3600
+        self.max_tracked_logins = 100000
+        self.max_attempts_per_login = 1000
         
-        # Security rules configuration
+        # Security rules configuration; membership-tested rules are frozensets
+        # and keyword lists (compiled below) are ordered tuples
         self.security_rules = {
-            "critical_keywords": [
+            "critical_keywords": (
                 "unauthorized access", "privilege escalation", "data exfiltration",
                 "malware", "code injection", "backdoor", "rootkit"
-            ],
-            "suspicious_keywords": [
+            ),
+            "suspicious_keywords": (
                 "brute_force", "suspicious", "anomalous", "unrecognized",
                 "multiple failed", "unusual activity"
-            ],
-            "blocked_ips": [
+            ),
+            # Addresses or CIDR blocks, e.g. from a threat-intel feed
+            "blocked_ips": frozenset({
                 "203.0.113.45", "185.220.101.182", "94.142.241.111"
-            ],
-            "restricted_resources": [
+            }),
+            "restricted_resources": frozenset({
                 "admin_panel", "database_service", "security_config", "backup_service"
-            ],
-            "high_risk_users": [
+            }),
+            "high_risk_users": frozenset({
                 "temp_user", "guest_user", "unknown_user", "backdoor_user"
-            ]
+            })
         }
         
-        # Threat severity levels
-        self.severity_levels = {
-            "info": 1,
-            "warning": 2, 
-            "high": 3,
-            "critical": 4
-        }
+        # Blocked CIDRs as network prefixes per (IP version, prefix length)
+        self._blocked_networks = self._build_blocked_networks()
+        
+        # Both keyword lists compiled into one matcher, so a description is
+        # scanned once regardless of how many keywords there are
+        self._iter_keywords = self._build_keyword_matcher()
+        
+        # Shortest keyword; shorter descriptions skip the keyword scan
+        self._min_keyword_length = min(
+            map(len, self.security_rules["critical_keywords"] + self.security_rules["suspicious_keywords"])
+        )
+        
+        # Detection checks in evaluation order, each with its precedence rank
+        # for tie-breaks. The failed-login check is stateful and so always runs
+        # first; then cheap lookups, with the keyword scan last.
+        self._checks = (
+            (5, self._check_failed_login_pattern),
+            (2, self._check_suspicious_ip),
+            (3, self._check_suspicious_user),
+            (4, self._check_restricted_resource),
+            (6, self._check_event_severity),
+            (7, self._check_threat_indicators),
+            (1, self._check_threat_keywords)
+        )
+        
+        # Stateless rule checks memoized on the event fields they read; event
+        # streams repeat the same IPs, users, resources and descriptions
+        cache = functools.lru_cache(maxsize=8192)
+        self._match_keywords = cache(self._scan_keywords)
+        self._match_blocked_ip = cache(self._scan_blocked_ip)
+        self._match_high_risk_user = cache(self._scan_high_risk_user)
+        self._match_restricted_resource = cache(self._scan_restricted_resource)
+        self._match_severity = cache(self._scan_severity)
+        self._match_indicators = cache(self._scan_indicators)
     
     def analyze_event(self, event):
         """
@@ -68,49 +175,9 @@ class SecurityMonitor:
         if not event:
             return None
         
-        # Display the event being analyzed
-        self._log_event_analysis(event)
-        
-        # Run multiple threat detection checks
-        threat_info = None
-        
-        # Check 1: Keyword-based detection
-        keyword_threat = self._check_threat_keywords(event)
-        if keyword_threat:
-            threat_info = keyword_threat
-        
-        # Check 2: IP-based detection
-        ip_threat = self._check_suspicious_ip(event)
-        if ip_threat and (not threat_info or ip_threat["risk_score"] > threat_info["risk_score"]):
-            threat_info = ip_threat
-        
-        # Check 3: User-based detection
-        user_threat = self._check_suspicious_user(event)
-        if user_threat and (not threat_info or user_threat["risk_score"] > threat_info["risk_score"]):
-            threat_info = user_threat
-        
-        # Check 4: Resource access detection
-        resource_threat = self._check_restricted_resource(event)
-        if resource_threat and (not threat_info or resource_threat["risk_score"] > threat_info["risk_score"]):
-            threat_info = resource_threat
-        
-        # Check 5: Failed login pattern detection
-        login_threat = self._check_failed_login_pattern(event)
-        if login_threat and (not threat_info or login_threat["risk_score"] > threat_info["risk_score"]):
-            threat_info = login_threat
-        
-        # Check 6: Severity-based detection
-        severity_threat = self._check_event_severity(event)
-        if severity_threat and (not threat_info or severity_threat["risk_score"] > threat_info["risk_score"]):
-            threat_info = severity_threat
-        
-        # Check 7: Threat indicators
-        indicator_threat = self._check_threat_indicators(event)
-        if indicator_threat and (not threat_info or indicator_threat["risk_score"] > threat_info["risk_score"]):
-            threat_info = indicator_threat
+        threat_info = self._detect_threat(event)
         
         if threat_info:
-            self._log_threat_detection(threat_info, event)
             # Send threat data to AWS CloudWatch
             self._send_to_aws(event, threat_info)
         else:
@@ -119,108 +186,244 @@ class SecurityMonitor:
         
         return threat_info
     
+    def analyze_events(self, events):
+        """
+        Analyze a batch of security events, e.g. from generate_event_batch().
+        
+        Events are checked in order, since the failed-login check counts
+        attempts across events. Their AWS deliveries are handed to the
+        dispatch thread as one queue item for the whole batch.
+        
+        Args:
+            events (iterable): Security events to analyze
+            
+        Returns:
+            list: Threat information or None for each event, in order
+        """
+        detect = self._detect_threat
+        results = []
+        deliveries = []
+        
+        for event in events:
+            if not event:
+                results.append(None)
+                continue
+            
+            threat_info = detect(event)
+            results.append(threat_info)
+            deliveries.append(("threat", event, threat_info) if threat_info else ("event", event, None))
+        
+        if deliveries:
+            self._enqueue_aws(("batch", deliveries, None))
+        
+        return results
+    
+    def _detect_threat(self, event):
+        """Run the threat detection checks on one event and log the outcome."""
+        # Read every field the checks need once, into attribute access
+        record = SecurityEvent.from_dict(event)
+        
+        # Display the event being analyzed
+        self._log_event_analysis(record)
+        
+        # Run the threat detection checks cheapest-first, keeping the highest
+        # risk score; ties go to the earlier check in the original order
+        threat_info = None
+        best_key = None
+        
+        for rank, check in self._checks:
+            threat = check(record)
+            if threat:
+                key = (threat["risk_score"], -rank)
+                if best_key is None or key > best_key:
+                    threat_info, best_key = threat, key
+                    # Nothing can outscore a maximum-risk threat
+                    if threat["risk_score"] >= 10:
+                        break
+        
+        if threat_info:
+            self._log_threat_detection(threat_info, record)
+        
+        return threat_info
+    
     def _log_event_analysis(self, event):
-        """Log the event being analyzed."""
-        print(f"🔍 Analyzing: {event['event_type']} from {event['user_id']} @ {event['source_ip']}")
+        """Log the event being analyzed (debug level; formatted only when enabled)."""
+        self.logger.debug("🔍 Analyzing: %s from %s @ %s",
+                          event.event_type, event.user_id, event.source_ip)
     
     def _log_threat_detection(self, threat_info, event):
         """Log threat detection with detailed information."""
-        risk_level = "🔴 CRITICAL" if threat_info["risk_score"] >= 8 else "🟡 HIGH" if threat_info["risk_score"] >= 6 else "🟠 MEDIUM"
+        risk_score = threat_info["risk_score"]
+        self.logger.warning(
+            "🚨 THREAT DETECTED: %s\n"
+            "   Risk Level: %s (Score: %s/10)\n"
+            "   Description: %s\n"
+            "   Event ID: %s\n"
+            "   Source: %s from %s\n"
+            "   Resource: %s",
+            threat_info['threat_type'],
+            _RISK_LABELS[max(0, min(int(risk_score), 10))], risk_score,
+            threat_info['description'],
+            event.event_id,
+            event.user_id, event.source_ip,
+            event.resource
+        )
+    
+    def _build_keyword_matcher(self):
+        """
+        Compile the critical and suspicious keywords into a single matcher.
         
-        print(f"🚨 THREAT DETECTED: {threat_info['threat_type']}")
-        print(f"   Risk Level: {risk_level} (Score: {threat_info['risk_score']}/10)")
-        print(f"   Description: {threat_info['description']}")
-        print(f"   Event ID: {event['event_id']}")
-        print(f"   Source: {event['user_id']} from {event['source_ip']}")
-        print(f"   Resource: {event['resource']}")
+        Returns:
+            callable: Maps a lowercased description to an iterable of
+                (rank, index, level, keyword) values, one per keyword found
+        """
+        # Values rank critical keywords before suspicious ones, then by list order
+        values = {}
+        for rank, (level, keywords) in enumerate((
+            ("critical", self.security_rules["critical_keywords"]),
+            ("suspicious", self.security_rules["suspicious_keywords"])
+        )):
+            for index, keyword in enumerate(keywords):
+                values[keyword.lower()] = (rank, index, level, keyword)
+        
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for word, value in values.items():
+                automaton.add_word(word, value)
+            automaton.make_automaton()
+            return lambda description: (value for _, value in automaton.iter(description))
+        
+        # The lookahead tries every offset so overlapping keywords are all seen; with the
+        # alternatives in rank order, each offset reports its best-ranked keyword
+        pattern = re.compile("(?=({}))".format("|".join(
+            re.escape(word) for word in sorted(values, key=values.__getitem__)
+        )))
+        return lambda description: map(values.__getitem__, pattern.findall(description))
     
     def _check_threat_keywords(self, event):
         """Check event description for threat-related keywords."""
-        description = event.get("description", "").lower()
-        
-        # Check for critical keywords
-        for keyword in self.security_rules["critical_keywords"]:
-            if keyword in description:
-                return {
-                    "threat_type": "KEYWORD_THREAT",
-                    "description": f"Critical security keyword detected: '{keyword}'",
-                    "risk_score": 9,
-                    "detection_method": "keyword_analysis"
-                }
-        
-        # Check for suspicious keywords
-        for keyword in self.security_rules["suspicious_keywords"]:
-            if keyword in description:
-                return {
-                    "threat_type": "SUSPICIOUS_ACTIVITY",
-                    "description": f"Suspicious activity keyword detected: '{keyword}'",
-                    "risk_score": 6,
-                    "detection_method": "keyword_analysis"
-                }
+        description = event.description
+        if len(description) < self._min_keyword_length:
+            return None
+        return _threat(self._match_keywords(description))
+    
+    def _scan_keywords(self, description):
+        """Scan a description for keywords (memoized as _match_keywords)."""
+        # Lowercased here so repeated descriptions skip it on a cache hit; one
+        # pass over the description keeps the highest-ranked keyword found
+        match = min(self._iter_keywords(description.lower()), default=None)
+        if match is None:
+            return None
         
-        return None
+        _, _, level, keyword = match
+        if level == "critical":
+            return ("KEYWORD_THREAT", f"Critical security keyword detected: '{keyword}'",
+                    9, "keyword_analysis")
+        
+        return ("SUSPICIOUS_ACTIVITY", f"Suspicious activity keyword detected: '{keyword}'",
+                6, "keyword_analysis")
+    
+    def _build_blocked_networks(self):
+        """
+        Index the blocked_ips rule by prefix length for CIDR lookups.
+        
+        Returns:
+            tuple: (version, prefix shift, frozenset of network prefixes) per
+                distinct prefix length, so a lookup costs one set probe each
+        """
+        prefixes = {}
+        for entry in self.security_rules["blocked_ips"]:
+            network = ipaddress.ip_network(entry, strict=False)
+            shift = network.max_prefixlen - network.prefixlen
+            prefixes.setdefault((network.version, shift), set()).add(
+                int(network.network_address) >> shift
+            )
+        
+        return tuple(
+            (version, shift, frozenset(values))
+            for (version, shift), values in prefixes.items()
+        )
     
     def _check_suspicious_ip(self, event):
         """Check if the source IP is on the blocked list."""
-        source_ip = event.get("source_ip")
-        
-        if source_ip in self.security_rules["blocked_ips"]:
-            return {
-                "threat_type": "MALICIOUS_IP",
-                "description": f"Request from known malicious IP: {source_ip}",
-                "risk_score": 8,
-                "detection_method": "ip_reputation"
-            }
+        return _threat(self._match_blocked_ip(event.source_ip))
+    
+    def _scan_blocked_ip(self, source_ip):
+        """Classify a source IP (memoized as _match_blocked_ip)."""
+        if source_ip in self.security_rules["blocked_ips"] or self._in_blocked_network(source_ip):
+            return ("MALICIOUS_IP", f"Request from known malicious IP: {source_ip}",
+                    8, "ip_reputation")
         
         return None
     
+    def _in_blocked_network(self, source_ip):
+        """Check whether a source IP falls inside any blocked CIDR block."""
+        try:
+            address = ipaddress.ip_address(source_ip)
+        except ValueError:
+            # Not an address (e.g. "internal" or missing)
+            return False
+        
+        value = int(address)
+        return any(
+            version == address.version and value >> shift in prefixes
+            for version, shift, prefixes in self._blocked_networks
+        )
+    
     def _check_suspicious_user(self, event):
         """Check if the user is flagged as high risk."""
-        user_id = event.get("user_id")
-        
+        return _threat(self._match_high_risk_user(event.user_id))
+    
+    def _scan_high_risk_user(self, user_id):
+        """Classify a user ID (memoized as _match_high_risk_user)."""
         if user_id in self.security_rules["high_risk_users"]:
-            return {
-                "threat_type": "HIGH_RISK_USER",
-                "description": f"Activity from high-risk user account: {user_id}",
-                "risk_score": 7,
-                "detection_method": "user_profile_analysis"
-            }
+            return ("HIGH_RISK_USER", f"Activity from high-risk user account: {user_id}",
+                    7, "user_profile_analysis")
         
         return None
     
     def _check_restricted_resource(self, event):
         """Check if access attempt is to a restricted resource."""
-        resource = event.get("resource")
-        
+        return _threat(self._match_restricted_resource(event.resource))
+    
+    def _scan_restricted_resource(self, resource):
+        """Classify an accessed resource (memoized as _match_restricted_resource)."""
         if resource in self.security_rules["restricted_resources"]:
-            return {
-                "threat_type": "RESTRICTED_RESOURCE_ACCESS",
-                "description": f"Access attempt to restricted resource: {resource}",
-                "risk_score": 7,
-                "detection_method": "resource_access_control"
-            }
+            return ("RESTRICTED_RESOURCE_ACCESS", f"Access attempt to restricted resource: {resource}",
+                    7, "resource_access_control")
         
         return None
     
     def _check_failed_login_pattern(self, event):
         """Track and detect failed login patterns."""
-        if event.get("event_type") != "failed_login":
+        if event.event_type != "failed_login":
             return None
         
-        source_ip = event.get("source_ip")
-        user_id = event.get("user_id")
+        source_ip = event.source_ip
+        user_id = event.user_id
         key = f"{user_id}@{source_ip}"
         
-        # Track failed attempts
-        if key not in self.failed_login_attempts:
-            self.failed_login_attempts[key] = 0
-        
-        self.failed_login_attempts[key] += 1
-        
-        if self.failed_login_attempts[key] >= self.max_failed_attempts:
+        # Record this attempt and drop those older than the window
+        now = time.monotonic()
+        attempts = self.failed_login_attempts
+        seen = attempts.pop(key, None)
+        if seen is None:
+            seen = deque(maxlen=self.max_attempts_per_login)
+        cutoff = now - self.failed_login_window
+        while seen and seen[0] <= cutoff:
+            seen.popleft()
+        seen.append(now)
+        attempts[key] = seen
+        count = len(seen)
+        
+        # Evict the least recently seen keys beyond the tracking limit
+        while len(attempts) > self.max_tracked_logins:
+            attempts.popitem(last=False)
+        
+        if count >= self.max_failed_attempts:
             return {
                 "threat_type": "BRUTE_FORCE_ATTACK",
-                "description": f"Multiple failed login attempts detected ({self.failed_login_attempts[key]} attempts)",
+                "description": f"Multiple failed login attempts detected ({count} attempts)",
                 "risk_score": 8,
                 "detection_method": "behavioral_analysis"
             }
@@ -229,42 +432,39 @@ class SecurityMonitor:
     
     def _check_event_severity(self, event):
         """Check event severity level for automatic threat classification."""
-        severity = event.get("severity", "info")
-        severity_score = self.severity_levels.get(severity, 1)
+        return _threat(self._match_severity(event.severity, event.description))
+    
+    def _scan_severity(self, severity, description):
+        """Classify an event by severity (memoized as _match_severity)."""
+        severity_score = SEVERITY_LEVELS.get(severity, 1)
         
         if severity_score >= 4:  # Critical
-            return {
-                "threat_type": "CRITICAL_SECURITY_EVENT",
-                "description": f"Critical severity event detected: {event.get('description')}",
-                "risk_score": 9,
-                "detection_method": "severity_analysis"
-            }
+            return ("CRITICAL_SECURITY_EVENT", f"Critical severity event detected: {description}",
+                    9, "severity_analysis")
         elif severity_score >= 3:  # High
-            return {
-                "threat_type": "HIGH_RISK_EVENT",
-                "description": f"High severity event detected: {event.get('description')}",
-                "risk_score": 7,
-                "detection_method": "severity_analysis"
-            }
+            return ("HIGH_RISK_EVENT", f"High severity event detected: {description}",
+                    7, "severity_analysis")
         
         return None
     
     def _check_threat_indicators(self, event):
         """Check for explicit threat indicators in the event."""
-        threat_indicators = event.get("threat_indicators", [])
+        threat_indicators = event.threat_indicators
         
         if not threat_indicators:
             return None
         
+        return _threat(self._match_indicators(threat_indicators))
+    
+    def _scan_indicators(self, threat_indicators):
+        """Assess a tuple of threat indicators (memoized as _match_indicators)."""
         # Assess risk based on threat indicators
-        risk_score = min(10, 5 + len(threat_indicators) * 2)
+        count = len(threat_indicators)
+        risk_score = _INDICATOR_RISK[count] if count < len(_INDICATOR_RISK) else 10
         
-        return {
-            "threat_type": "THREAT_INDICATORS_DETECTED",
-            "description": f"Multiple threat indicators present: {', '.join(threat_indicators)}",
-            "risk_score": risk_score,
-            "detection_method": "threat_intelligence"
-        }
+        return ("THREAT_INDICATORS_DETECTED",
+                f"Multiple threat indicators present: {', '.join(threat_indicators)}",
+                risk_score, "threat_intelligence")
     
     def get_monitoring_statistics(self):
         """Get current monitoring statistics."""
@@ -284,52 +484,119 @@ class SecurityMonitor:
         self.logger.info("Monitoring state reset completed")
     
     def _send_to_aws(self, event, threat_info):
-        """Send threat information to AWS CloudWatch and trigger Lambda functions."""
-        try:
-            # Prepare threat data for AWS
-            threat_data = {
-                'event_id': event.get('event_id'),
-                'threat_type': threat_info.get('threat_type'),
-                'risk_score': threat_info.get('risk_score'),
-                'source_ip': event.get('source_ip'),
-                'user_id': event.get('user_id'),
-                'resource': event.get('resource'),
-                'description': threat_info.get('description'),
-                'event_type': event.get('event_type'),
-                'severity': 'critical' if threat_info.get('risk_score', 0) >= 8 else 'high'
-            }
-            
-            # Send threat alert to CloudWatch
-            self.aws_integration.send_threat_alert(threat_data)
-            
-            # Send security metrics
-            self.aws_integration.send_security_metric(threat_data)
-            
-            # Trigger Lambda function for high-risk threats
-            if threat_info.get('risk_score', 0) >= 8:
-                self.aws_integration.trigger_lambda_response(threat_data)
-            
-            # Send detailed logs to CloudWatch Logs
-            log_group = '/aegis/security-events'
-            stream_name = f"threats-{datetime.now().strftime('%Y-%m-%d')}"
-            
-            # Create log stream if needed
-            self.aws_integration.create_log_stream(log_group, stream_name)
-            
-            # Send comprehensive log data
-            log_data = {
-                'timestamp': datetime.utcnow().isoformat(),
-                'event': event,
-                'threat_info': threat_info,
-                'aws_integration': True
-            }
-            
-            self.aws_integration.send_security_log(log_group, stream_name, log_data)
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to send threat data to AWS: {e}")
+        """Queue threat information for delivery to AWS by the dispatch thread."""
+        self._enqueue_aws(("threat", event, threat_info))
     
     def _send_event_metrics(self, event):
+        """Queue normal event metrics for delivery to AWS by the dispatch thread."""
+        self._enqueue_aws(("event", event, None))
+    
+    def _enqueue_aws(self, item):
+        """Hand an AWS delivery to the dispatch thread without blocking the caller."""
+        try:
+            self._aws_queue.put_nowait(item)
+        except queue.Full:
+            # AWS is falling behind; drop rather than stall event analysis
+            self.logger.warning("⚠️  AWS dispatch queue full, dropping %s data", item[0])
+    
+    def _aws_dispatch_loop(self):
+        """Deliver queued threat and event data to AWS in arrival order."""
+        while True:
+            self._deliver_aws(self._aws_queue.get())
+    
+    def _drain_aws_queue(self):
+        """Deliver whatever is still queued (registered to run at exit)."""
+        while True:
+            try:
+                item = self._aws_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._deliver_aws(item)
+    
+    def _deliver_aws(self, item):
+        """Deliver one queued item through the AWS integration."""
+        kind, event, threat_info = item
+        if kind == "batch":
+            # From analyze_events; event holds the batch's items in order
+            for batch_item in event:
+                self._deliver_aws(batch_item)
+        elif kind == "threat":
+            self._deliver_threat(event, threat_info)
+        else:
+            self._deliver_event_metrics(event)
+    
+    def _deliver_threat(self, event, threat_info):
+        """Send threat information to AWS CloudWatch and trigger Lambda functions."""
+        # Prepare threat data for AWS
+        risk_score = threat_info.get('risk_score', 0)
+        threat_data = {
+            'event_id': event.get('event_id'),
+            'threat_type': threat_info.get('threat_type'),
+            'risk_score': threat_info.get('risk_score'),
+            'source_ip': event.get('source_ip'),
+            'user_id': event.get('user_id'),
+            'resource': event.get('resource'),
+            'description': threat_info.get('description'),
+            'event_type': event.get('event_type'),
+            'severity': 'critical' if risk_score >= 8 else 'high'
+        }
+        
+        aws = self.aws_integration
+        steps = [
+            # Threat alert and security metrics to CloudWatch
+            ("threat alert", functools.partial(aws.send_threat_alert, threat_data)),
+            ("security metric", functools.partial(aws.send_security_metric, threat_data)),
+            # Detailed logs to CloudWatch Logs
+            ("security log", functools.partial(self._send_threat_log, event, threat_info))
+        ]
+        # Trigger Lambda function for high-risk threats
+        if risk_score >= 8:
+            steps.insert(2, ("Lambda response", functools.partial(aws.trigger_lambda_response, threat_data)))
+        
+        # Each step is independent; one failing must not drop the others
+        for name, step in steps:
+            try:
+                step()
+            except Exception as e:
+                self.logger.error("❌ Failed to send %s to AWS: %s", name, e)
+    
+    def _send_threat_log(self, event, threat_info):
+        """Write a threat's detailed log record to the day's CloudWatch Logs stream."""
+        timestamp, date = self._now()
+        log_group = '/aegis/security-events'
+        stream_name = f"threats-{date}"
+        
+        # Create each day's log stream once
+        stream_key = (log_group, stream_name)
+        if stream_key not in self._created_streams:
+            if self.aws_integration.create_log_stream(log_group, stream_name):
+                self._created_streams.add(stream_key)
+        
+        # Send comprehensive log data
+        log_data = {
+            'timestamp': timestamp,
+            'event': event,
+            'threat_info': threat_info
+        }
+        
+        self.aws_integration.send_security_log(log_group, stream_name, log_data)
+    
+    def _now(self):
+        """
+        Current time for threat logs, re-read from the clock at most once a second.
+        
+        Returns:
+            tuple: (UTC ISO timestamp to the second, local date as YYYY-MM-DD)
+        """
+        checked, timestamp, date = self._ts_cache
+        now = time.monotonic()
+        if now - checked >= 1.0:
+            timestamp = datetime.utcnow().isoformat(timespec='seconds')
+            date = datetime.now().strftime('%Y-%m-%d')
+            self._ts_cache = (now, timestamp, date)
+        return timestamp, date
+    
+    def _deliver_event_metrics(self, event):
         """Send normal event metrics to AWS CloudWatch."""
         try:
             # Send basic event metrics for monitoring